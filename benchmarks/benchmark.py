@@ -0,0 +1,135 @@
+"""
+Benchmarks reading, parsing and normalizing synthetic Greenlight exports.
+Every stage runs twice in a fresh process, once for the wall time and once
+with tracemalloc for the peak of the traced memory. The maximum resident set
+size of the timed process is reported as well. The results are written as
+JSON to compare versions:
+
+    python benchmarks/benchmark.py --rows 10000 1000000 --output results.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from importlib import metadata
+
+STAGES = ('read_files', 'parse', 'normalize')
+DEFAULT_ROWS = (10_000, 1_000_000, 10_000_000)
+
+
+def max_rss():
+    # Maximum resident set size of the process in bytes, if available
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def run_stage(stage, mainfile, trace_memory):
+    # Runs one stage in the current process, the stages before it are not
+    # measured
+    from nomad.datamodel import EntryArchive, EntryMetadata
+    from nomad.utils import get_logger
+
+    from nomad_greenlight_plugin import read_files as rf
+    from nomad_greenlight_plugin.parsers.parser import GreenlightParser
+    from nomad_greenlight_plugin.schema_packages.schema_package import (
+        quantity_column_types,
+    )
+
+    logger = get_logger(__name__)
+    archive = EntryArchive(metadata=EntryMetadata())
+    if stage == 'normalize':
+        GreenlightParser().parse(mainfile, archive, logger)
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if stage == 'read_files':
+        rf.read_files(mainfile, column_types=quantity_column_types())
+    elif stage == 'parse':
+        GreenlightParser().parse(mainfile, archive, logger)
+    else:
+        archive.data.normalize(archive, logger)
+    seconds = time.perf_counter() - start
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return dict(peak_memory=peak)
+    return dict(seconds=seconds, max_rss=max_rss())
+
+
+def measure(stage, mainfile):
+    # Fresh processes keep the stages and sizes from sharing memory peaks
+    context = multiprocessing.get_context('spawn')
+    result = {}
+    for trace_memory in (False, True):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result.update(
+                executor.submit(run_stage, stage, mainfile, trace_memory).result()
+            )
+    return result
+
+
+def run_benchmarks(rows_list, parts, directory, stages=STAGES):
+    from nomad_greenlight_plugin import synthetic
+
+    results = []
+    for rows in rows_list:
+        size_directory = os.path.join(directory, f'rows_{rows}')
+        os.makedirs(size_directory, exist_ok=True)
+        file_paths = synthetic.write_series(size_directory, rows, parts)
+        file_size = sum(os.path.getsize(file_path) for file_path in file_paths)
+        for stage in stages:
+            result = dict(rows=rows, parts=parts, file_size=file_size, stage=stage)
+            result.update(measure(stage, file_paths[0]))
+            print(json.dumps(result))
+            results.append(result)
+        for file_path in file_paths:
+            os.remove(file_path)
+    return results
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    argument_parser.add_argument(
+        '--rows', type=int, nargs='+', default=list(DEFAULT_ROWS)
+    )
+    argument_parser.add_argument('--parts', type=int, default=1)
+    argument_parser.add_argument('--stages', nargs='+', default=list(STAGES))
+    argument_parser.add_argument(
+        '--directory', help='Directory of the generated files, temporary if not set'
+    )
+    argument_parser.add_argument('--output', default='benchmark_results.json')
+    arguments = argument_parser.parse_args(argv)
+
+    from nomad_greenlight_plugin import read_files as rf
+
+    with tempfile.TemporaryDirectory(dir=arguments.directory) as directory:
+        results = run_benchmarks(
+            arguments.rows, arguments.parts, directory, arguments.stages
+        )
+    report = dict(
+        version=metadata.version('nomad-greenlight-plugin'),
+        reader_version=rf.READER_VERSION,
+        python=platform.python_version(),
+        platform=platform.platform(),
+        cpu_count=os.cpu_count(),
+        date=datetime.now(timezone.utc).isoformat(),
+        results=results,
+    )
+    with open(arguments.output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,426 @@
+import numpy as np
+import pandas as pd
+
+# Tags summarized for each file mark segment
+SEGMENT_TAGS = (
+    'cell_voltage_total',
+    'current',
+    'current_density',
+    'power',
+    'temp_coolant_inlet',
+)
+SEGMENT_STATISTICS = ('mean', 'min', 'max', 'last')
+# Tags reduced to the scalar summary of a test
+SUMMARY_TAGS = (
+    'current',
+    'current_density',
+    'power',
+    'cell_voltage_mean',
+    'cell_voltage_min',
+    'cell_voltage_max',
+    'temp_coolant_inlet',
+    'temp_coolant_outlet',
+    'cell_active_area',
+    'cell_count_total',
+)
+CYCLE_COLUMNS = (
+    'run',
+    'cycle',
+    'start_row',
+    'end_row',
+    'start_time',
+    'end_time',
+    'anodic_charge',
+    'cathodic_charge',
+)
+
+
+def segment_index(file_marks):
+    # Start and end rows and labels of the runs of equal file marks, rows
+    # without file mark are not part of any segment
+    file_marks = pd.Series(file_marks, dtype=object).reset_index(drop=True)
+    if len(file_marks) == 0:
+        return np.array([], dtype=int), np.array([], dtype=int), []
+    codes, _ = pd.factorize(file_marks, use_na_sentinel=True)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1))
+    ends = np.append(starts[1:], len(codes))
+    marked = codes[starts] >= 0
+    starts, ends = starts[marked], ends[marked]
+    return starts, ends, file_marks.iloc[starts].tolist()
+
+
+def segment_frames(labels, starts, ends, time):
+    # Table of the segments with their time spans
+    segments = pd.DataFrame(
+        dict(
+            label=labels,
+            start_row=starts,
+            end_row=ends,
+            start_time=time[starts],
+            end_time=time[ends - 1],
+        )
+    )
+    segments['duration'] = segments['end_time'] - segments['start_time']
+    return segments
+
+
+def segment_statistics(data, tags=SEGMENT_TAGS):
+    """
+    Segments of equal file mark of a Greenlight data frame with time span and
+    statistics of the given tags. Returns the segments and a data frame of the
+    statistics with one row per segment and (tag, statistic) columns.
+    """
+    starts, ends, labels = segment_index(data['file_mark'])
+    segments = segment_frames(
+        labels, starts, ends, data['time'].to_numpy(dtype='float64')
+    )
+    tags = [tag for tag in tags if tag in data.columns]
+    # Segment number of every row, rows outside of segments are dropped
+    rows = np.arange(len(data))
+    segment_ids = np.searchsorted(starts, rows, side='right') - 1
+    in_segment = segment_ids >= 0
+    in_segment[in_segment] = rows[in_segment] < ends[segment_ids[in_segment]]
+    statistics = (
+        data.loc[in_segment, tags]
+        .groupby(segment_ids[in_segment])
+        .agg(list(SEGMENT_STATISTICS))
+    )
+    return segments, statistics
+
+
+class SegmentAccumulator:
+    """
+    Segment index and statistics of a data frame which is read in consecutive
+    chunks of rows. The result equals segment_statistics of the whole frame.
+    """
+
+    def __init__(self, tags=SEGMENT_TAGS):
+        self.tags = tags
+        self.row_count = 0
+        self.labels = []
+        self.starts = []
+        self.ends = []
+        # Running sum, count, minimum, maximum and last value of every tag
+        self.statistics = []
+
+    def update(self, data):
+        tags = [tag for tag in self.tags if tag in data.columns]
+        self.tags = tags
+        starts, ends, labels = segment_index(data['file_mark'])
+        for start, end, label in zip(starts, ends, labels):
+            values = data[tags].iloc[start:end]
+            valid = values.notna()
+            chunk = dict(
+                sum=values.sum().to_numpy(),
+                count=valid.sum().to_numpy(),
+                min=values.min().to_numpy(),
+                max=values.max().to_numpy(),
+                last=values.ffill().iloc[-1].to_numpy(),
+            )
+            if (
+                start == 0
+                and self.ends
+                and self.ends[-1] == self.row_count
+                and self.labels[-1] == label
+            ):
+                # The segment continues from the previous chunk
+                running = self.statistics[-1]
+                running['sum'] = running['sum'] + chunk['sum']
+                running['count'] = running['count'] + chunk['count']
+                running['min'] = np.fmin(running['min'], chunk['min'])
+                running['max'] = np.fmax(running['max'], chunk['max'])
+                running['last'] = np.where(
+                    np.isnan(chunk['last']), running['last'], chunk['last']
+                )
+                self.ends[-1] = self.row_count + end
+                continue
+            self.labels.append(label)
+            self.starts.append(self.row_count + start)
+            self.ends.append(self.row_count + end)
+            self.statistics.append(chunk)
+        self.row_count += len(data)
+
+    def result(self, time):
+        """
+        Returns the segments with their time spans taken from the time column
+        of the whole frame and the data frame of the statistics.
+        """
+        starts = np.array(self.starts, dtype=int)
+        ends = np.array(self.ends, dtype=int)
+        segments = segment_frames(
+            self.labels, starts, ends, np.asarray(time, dtype='float64')
+        )
+        columns = {}
+        for index, tag in enumerate(self.tags):
+            total = np.array([running['sum'][index] for running in self.statistics])
+            count = np.array([running['count'][index] for running in self.statistics])
+            columns[tag, 'mean'] = np.divide(
+                total,
+                count,
+                out=np.full(len(total), np.nan),
+                where=count > 0,
+            )
+            for statistic in ('min', 'max', 'last'):
+                columns[tag, statistic] = np.array(
+                    [running[statistic][index] for running in self.statistics],
+                    dtype='float64',
+                )
+        statistics = pd.DataFrame(
+            columns,
+            index=np.arange(len(starts)),
+            columns=pd.MultiIndex.from_tuples(
+                [
+                    (tag, statistic)
+                    for tag in self.tags
+                    for statistic in SEGMENT_STATISTICS
+                ]
+            ),
+        )
+        return segments, statistics
+
+
+def valid_reduce(function, values):
+    # Reduction of the finite values, NaN if there are none
+    values = values[np.isfinite(values)]
+    return function(values) if len(values) > 0 else np.nan
+
+
+def run_summary(time, values, ocv_max_current_density):
+    """
+    Scalar summary of a test from the time and the SUMMARY_TAGS values, NaN
+    where a tag is missing. The OCV is the median mean cell voltage of the
+    rows with an absolute current density of at most ocv_max_current_density,
+    the stack temperature the mean of the coolant inlet and outlet
+    temperatures and the charge the integral of the current in ampere hours.
+    """
+    time = np.asarray(time, dtype='float64')
+    current = values['current']
+    open_circuit = np.abs(values['current_density']) <= ocv_max_current_density
+    charge_steps = 0.5 * (current[1:] + current[:-1]) * np.diff(time)
+    return dict(
+        duration=valid_reduce(lambda valid: valid[-1] - valid[0], time),
+        max_current=valid_reduce(np.max, current),
+        max_current_density=valid_reduce(np.max, values['current_density']),
+        max_power=valid_reduce(np.max, values['power']),
+        charge=valid_reduce(np.sum, charge_steps) / 3600,
+        ocv=valid_reduce(np.median, values['cell_voltage_mean'][open_circuit]),
+        min_cell_voltage=valid_reduce(np.min, values['cell_voltage_min']),
+        max_cell_voltage=valid_reduce(np.max, values['cell_voltage_max']),
+        mean_stack_temperature=valid_reduce(
+            np.mean,
+            np.concatenate(
+                (values['temp_coolant_inlet'], values['temp_coolant_outlet'])
+            ),
+        ),
+        active_area=valid_reduce(lambda valid: valid[-1], values['cell_active_area']),
+        cell_count=valid_reduce(lambda valid: valid[-1], values['cell_count_total']),
+    )
+
+
+def plateaus(setpoint, tolerance):
+    # Start and end rows of the runs of a setpoint changing by at most
+    # tolerance times its largest absolute value from row to row
+    setpoint = np.asarray(setpoint, dtype='float64')
+    if len(setpoint) == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    scale = np.nanmax(np.abs(setpoint), initial=0.0)
+    changed = ~(np.abs(np.diff(setpoint)) <= tolerance * scale)
+    starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+    ends = np.append(starts[1:], len(setpoint))
+    return starts, ends
+
+
+def polarization_curve(  # noqa: PLR0913
+    time, setpoint, values, *, min_duration, settling_fraction, tolerance
+):
+    """
+    Steady state points of a load step protocol. Plateaus of the setpoint
+    lasting at least min_duration are averaged after discarding their first
+    settling_fraction. Returns a data frame with the time window, the number
+    of averaged rows and the mean of each of the values per point.
+    """
+    time = np.asarray(time, dtype='float64')
+    starts, ends = plateaus(setpoint, tolerance)
+    start_time, end_time = time[starts], time[ends - 1]
+    duration = end_time - start_time
+    steady_time = start_time + settling_fraction * duration
+    # Plateau of every row, rows of short plateaus and of the settling
+    # portion are dropped
+    plateau_ids = np.searchsorted(starts, np.arange(len(time)), side='right') - 1
+    steady = (duration[plateau_ids] >= min_duration) & (
+        time >= steady_time[plateau_ids]
+    )
+    ids = plateau_ids[steady]
+    counts = np.bincount(ids, minlength=len(starts))
+    points = dict(start_time=steady_time, end_time=end_time, row_count=counts)
+    for name, all_values in values.items():
+        tag_values = np.asarray(all_values, dtype='float64')[steady]
+        valid = ~np.isnan(tag_values)
+        sums = np.bincount(ids[valid], tag_values[valid], minlength=len(starts))
+        valid_counts = np.bincount(ids[valid], minlength=len(starts))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            points[name] = sums / valid_counts
+    return pd.DataFrame(points)[counts > 0].reset_index(drop=True)
+
+
+def changed_rows(*columns):
+    # Rows where any of the columns differs from the previous row, NaN
+    # values count as unchanged
+    if len(columns[0]) == 0:
+        return np.zeros(0, dtype=bool)
+    changed = np.zeros(len(columns[0]), dtype=bool)
+    changed[0] = True
+    for column in columns:
+        values = np.asarray(column, dtype='float64')
+        previous, current = values[:-1], values[1:]
+        changed[1:] |= (previous != current) & ~(np.isnan(previous) & np.isnan(current))
+    return changed
+
+
+def impedance_sweeps(time, frequency, values, direction=None, min_points=3):
+    """
+    Impedance points of the EIS sweeps of a test. The EIS tags repeat the last
+    measured point until the next one, a new point starts where the point time
+    stamp, the frequency or any of the values changes. A sweep ends where the
+    frequency steps against the sweep direction, which is the sign of final
+    minus initial frequency or towards lower frequencies if not known. Returns
+    a data frame with the time, frequency and values of each point and the
+    number of its sweep, sweeps with less than min_points are dropped.
+    """
+    time = np.asarray(time, dtype='float64')
+    frequency = np.asarray(frequency, dtype='float64')
+    values = {
+        name: np.asarray(column, dtype='float64') for name, column in values.items()
+    }
+    points = np.flatnonzero(changed_rows(frequency, *values.values()) & (frequency > 0))
+    if len(points) == 0:
+        # No EIS sweep in the test
+        return pd.DataFrame(
+            dict(time=[], frequency=[], sweep=np.array([], dtype=int)),
+        ).assign(**{name: [] for name in values})
+    if direction is None:
+        direction = np.full(len(frequency), -1.0)
+    direction = np.asarray(direction, dtype='float64')[points]
+    direction[~(direction != 0)] = -1.0
+    steps = np.sign(np.diff(np.log(frequency[points])))
+    new_sweep = np.concatenate(([True], steps == -np.sign(direction[1:])))
+    sweeps = np.cumsum(new_sweep) - 1
+    data = pd.DataFrame(
+        dict(time=time[points], frequency=frequency[points], sweep=sweeps)
+    )
+    for name, column in values.items():
+        data[name] = column[points]
+    sizes = data['sweep'].map(data['sweep'].value_counts())
+    data = data[sizes >= min_points]
+    # Sweeps are renumbered after dropping the short ones
+    data['sweep'] = pd.factorize(data['sweep'])[0]
+    return data.reset_index(drop=True)
+
+
+def mask_runs(mask):
+    # Start and end rows of the runs of True values of a mask
+    edges = np.diff(np.concatenate(([0], np.asarray(mask, dtype=np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def voltammetry_runs(start_flags, file_marks, pattern):
+    # Runs of set CV start flag, or of file marks matching the pattern if the
+    # flag is never set
+    mask = np.zeros(0, dtype=bool)
+    if start_flags is not None:
+        mask = np.nan_to_num(np.asarray(start_flags, dtype='float64')) > 0
+    if not mask.any() and file_marks is not None:
+        mask = (
+            pd.Series(file_marks, dtype=object)
+            .str.contains(pattern, case=False, na=False)
+            .to_numpy(dtype=bool)
+        )
+    return mask_runs(mask)
+
+
+def turning_points(values):
+    # Rows where the direction of a series reverses, steps without change
+    # keep the previous direction
+    direction = np.sign(np.diff(np.asarray(values, dtype='float64')))
+    moving = np.where(direction != 0, np.arange(len(direction)), 0)
+    direction = direction[np.maximum.accumulate(moving)]
+    return np.flatnonzero(direction[1:] != direction[:-1]) + 1
+
+
+def run_mean(values, default):
+    # Mean of the valid values or the default if there are none
+    if np.isfinite(values).any():
+        return np.nanmean(values)
+    return default
+
+
+def cumulative_trapezoid(values, time):
+    # Cumulative trapezoid integral starting with 0 at the first row
+    steps = 0.5 * (values[1:] + values[:-1]) * np.diff(time)
+    return np.concatenate(([0.0], np.cumsum(steps)))
+
+
+def voltammetry_cycles(  # noqa: PLR0913
+    time, voltage, current, runs, *, apex1, apex2, tolerance
+):
+    """
+    Cycles of cyclic voltammetry runs given by their start and end rows. A
+    cycle ends at a reversal of the scan near apex2 and has to contain a
+    reversal near apex1, apexes are the run means of the setpoints or the
+    voltage extremes if not set. Reversals count as near an apex if they are
+    within tolerance times the apex span. Returns a data frame with the run,
+    cycle number in the run, start and end rows, time span and anodic and
+    cathodic charge per cycle.
+    """
+    time = np.asarray(time, dtype='float64')
+    voltage = np.asarray(voltage, dtype='float64')
+    current = np.asarray(current, dtype='float64')
+    apex1 = np.asarray(apex1, dtype='float64')
+    apex2 = np.asarray(apex2, dtype='float64')
+    cycles = []
+    for run, (start, end) in enumerate(zip(*runs)):
+        run_time, run_voltage = time[start:end], voltage[start:end]
+        run_current = np.nan_to_num(current[start:end])
+        upper = run_mean(apex1[start:end], np.nanmax(run_voltage))
+        lower = run_mean(apex2[start:end], np.nanmin(run_voltage))
+        span = tolerance * abs(upper - lower)
+        turns = turning_points(run_voltage)
+        apexes = np.select(
+            [
+                np.abs(run_voltage[turns] - upper) <= span,
+                np.abs(run_voltage[turns] - lower) <= span,
+            ],
+            [1, 2],
+            0,
+        )
+        turns, apexes = turns[apexes > 0], apexes[apexes > 0]
+        # Only the first reversal of a cluster near the same apex counts
+        first = np.concatenate(([True], apexes[1:] != apexes[:-1]))
+        turns, apexes = turns[first], apexes[first]
+        bounds = np.concatenate(([0], turns[apexes == 2], [end - start]))  # noqa: PLR2004
+        cycle_starts, cycle_ends = bounds[:-1], bounds[1:]
+        upper_turns = turns[apexes == 1]
+        complete = np.searchsorted(upper_turns, cycle_starts, side='right') < (
+            np.searchsorted(upper_turns, cycle_ends, side='left')
+        )
+        cycle_starts, cycle_ends = cycle_starts[complete], cycle_ends[complete]
+        anodic = cumulative_trapezoid(np.clip(run_current, 0, None), run_time)
+        cathodic = cumulative_trapezoid(np.clip(run_current, None, 0), run_time)
+        last = np.minimum(cycle_ends, end - start - 1)
+        cycles.append(
+            pd.DataFrame(
+                dict(
+                    run=run,
+                    cycle=np.arange(len(cycle_starts)),
+                    start_row=start + cycle_starts,
+                    end_row=start + cycle_ends,
+                    start_time=run_time[cycle_starts],
+                    end_time=run_time[last],
+                    anodic_charge=anodic[last] - anodic[cycle_starts],
+                    cathodic_charge=cathodic[last] - cathodic[cycle_starts],
+                )
+            )
+        )
+    if not cycles:
+        return pd.DataFrame(columns=CYCLE_COLUMNS)
+    return pd.concat(cycles, ignore_index=True)
@@ -1,23 +1,91 @@
 from nomad.config.models.plugins import AppEntryPoint
-from nomad.config.models.ui import App, Column, Columns, FilterMenu, FilterMenus
+from nomad.config.models.ui import (
+    App,
+    Axis,
+    Column,
+    Menu,
+    MenuItemHistogram,
+    MenuItemTerms,
+    SearchQuantities,
+)
+
+SCHEMA = (
+    'nomad_greenlight_plugin.schema_packages.schema_package.GreenlightSchemaPackage'
+)
+
+
+def schema_quantity(path):
+    # Search quantity of the Greenlight schema package
+    return f'data.{path}#{SCHEMA}'
+
+
+def histogram(path, title, unit=None):
+    return MenuItemHistogram(
+        title=title,
+        x=Axis(search_quantity=schema_quantity(path), unit=unit),
+        show_input=True,
+    )
+
 
 app_entry_point = AppEntryPoint(
-    name='NewApp',
-    description='New app entry point configuration.',
+    name='GreenlightApp',
+    description='Search Greenlight fuel cell tests by their summaries.',
     app=App(
-        label='NewApp',
-        path='app',
-        category='simulation',
-        columns=Columns(
-            selected=['entry_id'],
-            options={
-                'entry_id': Column(),
-            },
-        ),
-        filter_menus=FilterMenus(
-            options={
-                'material': FilterMenu(label='Material'),
-            }
+        label='Greenlight tests',
+        path='greenlight',
+        category='Experiment',
+        description='Fuel cell tests of the Greenlight test stations, searchable '
+        'by the scalar summaries computed when the entries are normalized.',
+        search_quantities=SearchQuantities(include=[f'*#{SCHEMA}']),
+        filters_locked={'section_defs.definition_qualified_name': [SCHEMA]},
+        columns=[
+            Column(search_quantity=schema_quantity('name'), selected=True),
+            Column(search_quantity=schema_quantity('station_id'), selected=True),
+            Column(search_quantity=schema_quantity('start_time'), selected=True),
+            Column(
+                search_quantity=schema_quantity('summary.duration'),
+                unit='hour',
+                selected=True,
+            ),
+            Column(search_quantity=schema_quantity('summary.ocv'), selected=True),
+            Column(
+                search_quantity=schema_quantity('summary.max_current_density'),
+                selected=True,
+            ),
+            Column(search_quantity=schema_quantity('summary.min_cell_voltage')),
+            Column(
+                search_quantity=schema_quantity('summary.mean_stack_temperature'),
+                unit='degree_Celsius',
+            ),
+            Column(search_quantity=schema_quantity('summary.max_power')),
+            Column(search_quantity=schema_quantity('summary.charge')),
+            Column(search_quantity=schema_quantity('summary.active_area')),
+            Column(search_quantity=schema_quantity('summary.cell_count')),
+            Column(search_quantity='entry_id'),
+            Column(search_quantity='upload_create_time'),
+        ],
+        menu=Menu(
+            items=[
+                MenuItemTerms(
+                    title='Station', search_quantity=schema_quantity('station_id')
+                ),
+                histogram('summary.duration', 'Duration', 'hour'),
+                histogram('summary.ocv', 'Open circuit voltage', 'volt'),
+                histogram(
+                    'summary.max_current_density',
+                    'Maximum current density',
+                    'ampere / centimeter ** 2',
+                ),
+                histogram('summary.min_cell_voltage', 'Minimum cell voltage', 'volt'),
+                histogram(
+                    'summary.mean_stack_temperature',
+                    'Mean stack temperature',
+                    'degree_Celsius',
+                ),
+                histogram('summary.max_power', 'Maximum power', 'watt'),
+                histogram('summary.active_area', 'Active area', 'centimeter ** 2'),
+                histogram('summary.cell_count', 'Cell count'),
+            ]
         ),
     ),
 )
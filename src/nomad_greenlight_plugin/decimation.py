@@ -0,0 +1,52 @@
+import numpy as np
+
+
+def min_max_indices(values, max_points):
+    """
+    Indices of a shape-preserving subset of at most max_points + 2 values. The
+    values are split into buckets of equal length, each bucket keeps its
+    minimum and maximum, so that peaks and step edges stay visible. The first
+    and last value are always kept.
+    """
+    values = np.asarray(values, dtype='float64')
+    length = len(values)
+    if length <= max_points:
+        return np.arange(length)
+    bucket_count = max(1, max_points // 2)
+    bucket_size = -(-length // bucket_count)
+    padded = np.full(bucket_count * bucket_size, np.nan)
+    padded[:length] = values
+    is_nan = np.isnan(padded)
+    # NaN values are never picked unless a bucket holds nothing else
+    lows = np.where(is_nan, np.inf, padded).reshape(bucket_count, bucket_size)
+    highs = np.where(is_nan, -np.inf, padded).reshape(bucket_count, bucket_size)
+    starts = np.arange(bucket_count) * bucket_size
+    indices = np.concatenate(
+        (
+            starts + lows.argmin(axis=1),
+            starts + highs.argmax(axis=1),
+            [0, length - 1],
+        )
+    )
+    indices = np.unique(indices)
+    return indices[indices < length]
+
+
+def min_max_pyramid(values, max_points, factor=4):
+    """
+    Indices of the levels of a min/max decimation pyramid, from the full series
+    down to the first level with at most max_points + 2 values. Each level is
+    decimated from the previous one to about 1/factor of its length.
+    """
+    indices = np.arange(len(values))
+    levels = [indices]
+    values = np.asarray(values, dtype='float64')
+    while len(indices) > max_points + 2:
+        level_indices = min_max_indices(
+            values[indices], max(max_points, len(indices) // factor)
+        )
+        if len(level_indices) >= len(indices):
+            break
+        indices = indices[level_indices]
+        levels.append(indices)
+    return levels
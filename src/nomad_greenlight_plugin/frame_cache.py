@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from functools import cache
+
+import numpy as np
+import pandas as pd
+
+from nomad_greenlight_plugin import read_files as rf
+
+META_FILE = 'meta.json'
+NUMERIC_FILE = 'numeric.npy'
+
+
+class FrameCache:
+    """
+    On-disk cache of parsed Greenlight frames. Entries are keyed by the content
+    hash of the parsed files and the reader version. Numeric columns are stored
+    as one memory-mapped array, string columns as codes and unique values.
+    """
+
+    def __init__(self, directory, max_size=10 * 1024**3):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, file_paths, options=None):
+        file_hash = hashlib.sha256(rf.READER_VERSION.encode())
+        # Reader options changing the parsed frame are part of the key
+        file_hash.update(json.dumps(options, sort_keys=True).encode())
+        for file_path in file_paths:
+            with open(file_path, 'rb') as file:
+                for chunk in iter(lambda: file.read(1024**2), b''):
+                    file_hash.update(chunk)
+            # Separate the parts of a series
+            file_hash.update(b'\0')
+        return file_hash.hexdigest()
+
+    def path_key(self, file_path, options=None):
+        # Key of the last read of a growing file, independent of its content
+        path_hash = hashlib.sha256(rf.READER_VERSION.encode())
+        path_hash.update(json.dumps(options, sort_keys=True).encode())
+        path_hash.update(os.path.abspath(file_path).encode())
+        return f'path_{path_hash.hexdigest()}'
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def load(self, key):
+        entry_path = self.entry_path(key)
+        meta_file = os.path.join(entry_path, META_FILE)
+        if not os.path.isfile(meta_file):
+            self.misses += 1
+            return None
+        with open(meta_file) as file:
+            meta = json.load(file)
+        # Copy-on-write mapping, changes of the frame never reach the cache
+        numeric = np.load(os.path.join(entry_path, NUMERIC_FILE), mmap_mode='c')
+        data = pd.DataFrame(numeric.T, columns=meta['numeric_columns'], copy=False)
+        for index, col in enumerate(meta['string_columns']):
+            codes = np.load(os.path.join(entry_path, f'codes_{index}.npy'))
+            uniques = np.load(os.path.join(entry_path, f'uniques_{index}.npy'))
+            values = pd.Categorical.from_codes(codes, uniques).astype(object)
+            data.insert(meta['columns'].index(col), col, values)
+        # Mark the entry as recently used for the eviction
+        os.utime(meta_file)
+        self.hits += 1
+        data_file_object = rf.GreenlightDataFile(
+            data=data,
+            units=meta['units'],
+            header=meta['header'],
+            display_names=meta['display_names'],
+            conversion_issues=meta['conversion_issues'],
+            unknown_units=meta['unknown_units'],
+        )
+        if meta['start_time'] is not None:
+            data_file_object.start_time = datetime.fromisoformat(meta['start_time'])
+        data_file_object.end_offset = meta.get('end_offset')
+        data_file_object.prefix_hash = meta.get('prefix_hash')
+        data_file_object.part_issues = meta['part_issues']
+        return data_file_object
+
+    def store(self, key, data_file_object):
+        data = data_file_object.data
+        numeric_columns = [
+            col for col in data.columns if pd.api.types.is_float_dtype(data[col])
+        ]
+        string_columns = [col for col in data.columns if col not in numeric_columns]
+        meta = dict(
+            columns=list(data.columns),
+            numeric_columns=numeric_columns,
+            string_columns=string_columns,
+            units=data_file_object.units,
+            header=data_file_object.header,
+            display_names=data_file_object.display_names,
+            conversion_issues=data_file_object.conversion_issues,
+            unknown_units=data_file_object.unknown_units,
+            start_time=(
+                data_file_object.start_time.isoformat()
+                if data_file_object.start_time is not None
+                else None
+            ),
+            end_offset=data_file_object.end_offset,
+            prefix_hash=data_file_object.prefix_hash,
+            part_issues=data_file_object.part_issues,
+        )
+        temp_path = tempfile.mkdtemp(dir=self.directory, prefix='.tmp_')
+        try:
+            numeric = np.empty((len(numeric_columns), len(data)))
+            for index, col in enumerate(numeric_columns):
+                numeric[index] = data[col].to_numpy()
+            np.save(os.path.join(temp_path, NUMERIC_FILE), numeric)
+            for index, col in enumerate(string_columns):
+                codes, uniques = pd.factorize(data[col].astype(object))
+                np.save(os.path.join(temp_path, f'codes_{index}.npy'), codes)
+                np.save(
+                    os.path.join(temp_path, f'uniques_{index}.npy'),
+                    np.asarray(uniques, dtype=str),
+                )
+            with open(os.path.join(temp_path, META_FILE), 'w') as file:
+                json.dump(meta, file)
+            entry_path = self.entry_path(key)
+            if os.path.isdir(entry_path):
+                # Entries of growing files are replaced by their newer reads
+                shutil.rmtree(entry_path, ignore_errors=True)
+            os.rename(temp_path, entry_path)
+        except OSError:
+            # Another process stored the same entry in the meantime
+            shutil.rmtree(temp_path, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        # Remove least recently used entries until the cache fits its size
+        entries = []
+        total_size = 0
+        for key in os.listdir(self.directory):
+            entry_path = self.entry_path(key)
+            meta_file = os.path.join(entry_path, META_FILE)
+            if not os.path.isfile(meta_file):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(entry_path, file))
+                for file in os.listdir(entry_path)
+            )
+            entries.append((os.path.getmtime(meta_file), size, entry_path))
+            total_size += size
+        for _, size, entry_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry_path, ignore_errors=True)
+            total_size -= size
+
+
+@cache
+def get_frame_cache(directory, max_size):
+    # One cache per process, so that the counters cover all parsed entries
+    return FrameCache(directory, max_size=max_size)
@@ -0,0 +1,52 @@
+import h5py
+
+TAGS_GROUP = 'tags'
+CHUNK_ROWS = 2**16
+COMPRESSION_LEVEL = 1
+
+
+def open_raw_file(archive, path, mode='rb'):
+    """
+    Opens a file of the upload through the context of the archive, if the
+    context resolves the mainfile of the entry, and as a local file otherwise.
+    """
+    context = archive.m_context
+    metadata = getattr(archive, 'metadata', None)
+    try:
+        if (
+            context is not None
+            and metadata is not None
+            and metadata.mainfile
+            and context.raw_path_exists(metadata.mainfile)
+        ):
+            return context.raw_file(path, mode)
+    except NotImplementedError:
+        pass
+    return open(path, mode)
+
+
+def write_tags(file, data, tags):
+    # One chunked and compressed dataset per tag, so that reading a slice
+    # of a tag only decompresses the chunks it overlaps
+    chunk_rows = max(1, min(len(data), CHUNK_ROWS))
+    with h5py.File(file, 'w') as hdf5_file:
+        group = hdf5_file.create_group(TAGS_GROUP)
+        for name in tags:
+            group.create_dataset(
+                name,
+                data=data[name].to_numpy(dtype='float64'),
+                chunks=(chunk_rows,),
+                compression='gzip',
+                compression_opts=COMPRESSION_LEVEL,
+                shuffle=True,
+            )
+
+
+def dataset_reference(path, name):
+    # HDF5Reference of the dataset of a tag in the file at the upload path
+    return f'{path}#/{TAGS_GROUP}/{name}'
+
+
+def read_dataset(file, path, start=None, stop=None):
+    with h5py.File(file, 'r') as hdf5_file:
+        return hdf5_file[path][start:stop]
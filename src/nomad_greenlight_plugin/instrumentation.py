@@ -0,0 +1,162 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+PROFILERS = ('cprofile', 'pyinstrument')
+PROFILE_EXTENSIONS = {'cprofile': '.prof', 'pyinstrument': '.html'}
+
+# Timer of the running parser or normalizer, stages outside of a run are not
+# measured
+active_timer = ContextVar('active_timer', default=None)
+
+
+def max_rss():
+    # Maximum resident set size of the process in bytes, if available
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class StageTimer:
+    """
+    Wall time, CPU time and memory of the named stages of a parser or
+    normalizer run. Stages may be nested, nested names are joined with '/'.
+    Repeated stages, e.g. the chunks of a chunked read, are summed up. The
+    peak memory above the memory at the start of a stage is only traced with
+    trace_memory, as tracemalloc slows down allocations.
+    """
+
+    def __init__(self, component, trace_memory=False):
+        self.component = component
+        self.trace_memory = trace_memory
+        self.records = {}
+        self.stack = []
+
+    @contextmanager
+    def activate(self):
+        # Make this the timer of the module level stage function
+        token = active_timer.set(self)
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            yield self
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            active_timer.reset(token)
+
+    @contextmanager
+    def stage(self, name):
+        frame = dict(name='/'.join([*(f['name'] for f in self.stack[-1:]), name]))
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self.stack:
+                self.stack[-1]['peak'] = max(self.stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame.update(start_memory=current, peak=current)
+        self.stack.append(frame)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            self.stack.pop()
+            record = self.records.setdefault(
+                frame['name'],
+                dict(
+                    name=frame['name'],
+                    calls=0,
+                    wall_time=0.0,
+                    cpu_time=0.0,
+                    max_rss=None,
+                    peak_memory=None,
+                ),
+            )
+            record['calls'] += 1
+            record['wall_time'] += wall_time
+            record['cpu_time'] += cpu_time
+            record['max_rss'] = max_rss()
+            if 'start_memory' in frame:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                if self.stack:
+                    self.stack[-1]['peak'] = max(self.stack[-1]['peak'], peak)
+                record['peak_memory'] = max(
+                    record['peak_memory'] or 0, peak - frame['start_memory']
+                )
+
+    def log(self, logger):
+        if logger is None:
+            return
+        for record in self.records.values():
+            logger.info(
+                f'Greenlight {self.component} stage',
+                component=self.component,
+                **record,
+            )
+
+
+def stage(name):
+    """
+    Measures a stage of the active timer, does nothing outside of a run.
+    """
+    timer = active_timer.get()
+    if timer is None:
+        return nullcontext()
+    return timer.stage(name)
+
+
+def profile_path(directory, mainfile, component, profiler):
+    # Profile file named after the mainfile, next to other profiles
+    if directory is None:
+        directory = tempfile.gettempdir()
+    name = os.path.splitext(os.path.basename(mainfile))[0]
+    return os.path.join(directory, f'{name}.{component}{PROFILE_EXTENSIONS[profiler]}')
+
+
+@contextmanager
+def profile(profiler, file_path, logger=None):
+    """
+    Profiles the enclosed code with cProfile or pyinstrument and writes the
+    statistics, respectively the HTML report, to file_path. Does nothing if
+    profiler is None or pyinstrument is not installed.
+    """
+    if profiler is None:
+        yield
+        return
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            if logger is not None:
+                logger.warning('Greenlight profiling requires pyinstrument')
+            yield
+            return
+        profiler_object = Profiler()
+        profiler_object.start()
+        try:
+            yield
+        finally:
+            profiler_object.stop()
+            with open(file_path, 'w') as file:
+                file.write(profiler_object.output_html())
+    else:
+        import cProfile
+
+        profiler_object = cProfile.Profile()
+        profiler_object.enable()
+        try:
+            yield
+        finally:
+            profiler_object.disable()
+            profiler_object.dump_stats(file_path)
+    if logger is not None:
+        logger.info('Greenlight profile written', profiler=profiler, path=file_path)
@@ -13,5 +13,5 @@ class GreenlightNormalizerEntryPoint(NormalizerEntryPoint):
 
 normalizer_entry_point = GreenlightNormalizerEntryPoint(
     name='GreenlightNormalizer',
-    description='New normalizer entry point configuration.',
+    description='Builds the search results of Greenlight entries.',
 )
@@ -10,17 +10,68 @@ if TYPE_CHECKING:
         BoundLogger,
     )
 
+import numpy as np
 from nomad.config import config
+from nomad.datamodel.results import ELN, Results
 from nomad.normalizing import Normalizer
 
 configuration = config.get_plugin_entry_point(
     'nomad_greenlight_plugin.normalizers:normalizer_entry_point'
 )
 
+# Loading the normalizer with nomad.normalizing must not import the schema
+# package, entries are recognized by the name of their section definition
+SCHEMA = (
+    'nomad_greenlight_plugin.schema_packages.schema_package.GreenlightSchemaPackage'
+)
+# Methods of the results by the subsection of the entry holding their data
+METHODS = {
+    'polarization_curve': 'polarization curve',
+    'impedance_spectra': 'electrochemical impedance spectroscopy',
+    'voltammetry_cycles': 'cyclic voltammetry',
+}
+
+
+def add_unique(values, new_values):
+    # Values followed by the new values not in them yet
+    values = list(values or [])
+    values.extend(value for value in new_values if value and value not in values)
+    return values
+
 
 class GreenlightNormalizer(Normalizer):
+    # Greenlight entries have no domain, the default restricts to DFT entries
+    domain = None
+
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
         super().normalize(archive, logger)
-        logger.info('GreenlightNormalizer.normalize', parameter=configuration.parameter)
-        if archive.results and archive.results.material:
-            archive.results.material.elements = ['C', 'O']
+        data = archive.data
+        if data is None or data.m_def.qualified_name() != SCHEMA:
+            return
+        if logger is not None:
+            logger.info(
+                'GreenlightNormalizer.normalize', parameter=configuration.parameter
+            )
+        time = data.column('time')
+        if data.summary is None and time is not None:
+            # The schema normalization has not run yet, the summary is reduced
+            # from the arrays already in the entry
+            data.normalize_summary(np.asarray(time, dtype='float64'))
+        self.normalize_results(archive, data)
+
+    def normalize_results(self, archive: 'EntryArchive', data) -> None:
+        # Test name, station, methods and file marks for the search
+        if archive.results is None:
+            archive.results = Results()
+        if archive.results.eln is None:
+            archive.results.eln = ELN()
+        eln = archive.results.eln
+        methods = ['fuel cell test']
+        methods.extend(
+            method for name, method in METHODS.items() if getattr(data, name)
+        )
+        eln.sections = add_unique(eln.sections, [type(data).__name__])
+        eln.names = add_unique(eln.names, [data.name])
+        eln.instruments = add_unique(eln.instruments, [data.station_id])
+        eln.methods = add_unique(eln.methods, methods)
+        eln.tags = add_unique(eln.tags, [segment.label for segment in data.segments])
@@ -1,9 +1,79 @@
+from typing import Literal, Optional
+
 from nomad.config.models.plugins import ParserEntryPoint
 from pydantic import Field
 
 
 class GreenlightParserEntryPoint(ParserEntryPoint):
     parameter: int = Field(0, description='Custom configuration parameter')
+    max_workers: Optional[int] = Field(
+        None,
+        description='Number of processes reading the parts of a multi-part '
+        'series, defaults to the number of CPUs',
+    )
+    cache_directory: Optional[str] = Field(
+        None,
+        description='Directory of the on-disk cache of parsed frames, '
+        'caching is disabled if not set',
+    )
+    cache_max_size: int = Field(
+        10 * 1024**3, description='Maximum size of the frame cache in bytes'
+    )
+    incremental: bool = Field(
+        False,
+        description='Only parse the rows appended to a growing stand-alone file '
+        'since its last parse, requires the frame cache',
+    )
+    memory_limit: Optional[int] = Field(
+        None,
+        description='Memory in bytes available to read a file, larger files are '
+        'read in chunks of rows into pre-sized columns',
+    )
+    include_tags: Optional[list[str]] = Field(
+        None,
+        description='Tag names, glob patterns or tag groups (see TAG_GROUPS in '
+        'read_files) to parse, all tags are parsed if not set',
+    )
+    exclude_tags: list[str] = Field(
+        [],
+        description='Tag names, glob patterns or tag groups which are not '
+        'parsed, e.g. ["scratch", "scattergraph", "signals"]',
+    )
+    storage_mode: Literal['columns', 'packed', 'hdf5'] = Field(
+        'columns',
+        description='Store each numeric tag as a separate quantity, all '
+        'numeric tags as one packed matrix or in an HDF5 file next to the '
+        'mainfile',
+    )
+    run_length_encoding: bool = Field(
+        False,
+        description='Store numeric tags which rarely change as change indices '
+        'and values',
+    )
+    run_length_max_fraction: float = Field(
+        0.01,
+        description='Maximum fraction of rows with a changed value of a run '
+        'length encoded tag',
+    )
+    store_processing_metrics: bool = Field(
+        False,
+        description='Store the time and memory of the parser stages in the '
+        'processing_stages of the entry, they are always logged',
+    )
+    trace_memory: bool = Field(
+        False,
+        description='Trace the peak memory of the parser stages with '
+        'tracemalloc, which slows down the parser',
+    )
+    profiler: Optional[Literal['cprofile', 'pyinstrument']] = Field(
+        None,
+        description='Profile the parser with cProfile or pyinstrument '
+        '(optional dependency)',
+    )
+    profile_directory: Optional[str] = Field(
+        None,
+        description='Directory of the profiles, the temporary directory if not set',
+    )
 
     def load(self):
         from nomad_greenlight_plugin.parsers.parser import GreenlightParser
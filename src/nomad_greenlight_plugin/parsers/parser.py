@@ -11,12 +11,21 @@ if TYPE_CHECKING:
     )
 
 # Import additional libraries
+import os
+
 from nomad.config import config
 from nomad.parsing.parser import MatchingParser
 
+from nomad_greenlight_plugin import analysis, instrumentation
 from nomad_greenlight_plugin import read_files as rf
+from nomad_greenlight_plugin.frame_cache import get_frame_cache
 from nomad_greenlight_plugin.schema_packages.schema_package import (
+    EncodedTag,
     GreenlightSchemaPackage,
+    HDF5Tag,
+    Segment,
+    SegmentStatistics,
+    quantity_column_types,
 )
 
 configuration = config.get_plugin_entry_point(
@@ -25,6 +34,146 @@ configuration = config.get_plugin_entry_point(
 
 
 class GreenlightParser(MatchingParser):
+    def upload_path(self, archive: 'EntryArchive', mainfile: str, file_name: str):
+        # Path of a file in the directory of the mainfile, relative to the
+        # upload if the entry knows its mainfile and local otherwise
+        if archive.metadata is not None and archive.metadata.mainfile:
+            return os.path.join(os.path.dirname(archive.metadata.mainfile), file_name)
+        return os.path.join(os.path.dirname(mainfile), file_name)
+
+    def parse_series_part(
+        self, mainfile: str, owner_file: str, archive: 'EntryArchive'
+    ) -> None:
+        # Parts other than the series owner only reference the combined entry
+        _, part_number = rf.split_part_name(mainfile)
+        header = rf.read_header(mainfile)
+        owner_mainfile = os.path.basename(owner_file)
+        if archive.metadata is not None and archive.metadata.mainfile:
+            owner_mainfile = os.path.join(
+                os.path.dirname(archive.metadata.mainfile), owner_mainfile
+            )
+        archive.data = GreenlightSchemaPackage(
+            name=header.get('Test Name'),
+            part_number=part_number,
+            series_entry=f'../upload/archive/mainfile/{owner_mainfile}#/data',
+        )
+
+    def tag_selection(self):
+        # Tags excluded by the configuration are never decoded by the reader
+        if configuration.include_tags is None and not configuration.exclude_tags:
+            return None
+        return dict(
+            include=configuration.include_tags, exclude=configuration.exclude_tags
+        )
+
+    def store_tags(
+        self,
+        archive: 'EntryArchive',
+        mainfile: str,
+        data,
+        logger: 'BoundLogger' = None,
+    ) -> None:
+        # Time series tags in the configured encoding and storage mode
+        columns = [name for name in data.columns if name in archive.data]
+        column_types = quantity_column_types()
+        quantities = GreenlightSchemaPackage.m_def.all_quantities
+        numeric_tags = [name for name in columns if column_types.get(name) == 'float64']
+        archive.data.row_count = len(data)
+        if configuration.run_length_encoding:
+            # Setpoints, limits and settings only store the rows they change in
+            encoded = rf.encode_run_lengths(
+                data, numeric_tags, configuration.run_length_max_fraction
+            )
+            for name, (change_indices, values) in encoded.items():
+                archive.data.encoded_tags.append(
+                    EncodedTag(
+                        name=name,
+                        unit=str(quantities[name].unit),
+                        change_indices=change_indices,
+                        values=values,
+                    )
+                )
+            columns = [name for name in columns if name not in encoded]
+            numeric_tags = [name for name in numeric_tags if name not in encoded]
+        if configuration.storage_mode == 'hdf5':
+            # Numeric tags are referenced by dataset and only read from the
+            # HDF5 file when needed. The file keeps the extension of the
+            # mainfile in its name, so it never looks like a part of a series.
+            from nomad_greenlight_plugin.hdf5_storage import (
+                dataset_reference,
+                open_raw_file,
+                write_tags,
+            )
+
+            hdf5_file = self.upload_path(
+                archive, mainfile, f'{os.path.basename(mainfile)}.h5'
+            )
+            with open_raw_file(archive, hdf5_file, 'w+b') as file:
+                write_tags(file, data, numeric_tags)
+            archive.data.hdf5_tags = [
+                HDF5Tag(name=name, dataset=dataset_reference(hdf5_file, name))
+                for name in numeric_tags
+            ]
+            columns = [name for name in columns if name not in numeric_tags]
+        elif configuration.storage_mode == 'packed':
+            # All numeric tags in one matrix, serialized as a single array
+            archive.data.packed_data = data[numeric_tags].to_numpy(dtype='float64')
+            archive.data.packed_tags = numeric_tags
+            archive.data.packed_units = [
+                str(quantities[name].unit) for name in numeric_tags
+            ]
+            columns = [name for name in columns if name not in numeric_tags]
+        for name in columns:
+            values = data[name]
+            if values.dtype == object:
+                # Rows before the first file mark have none
+                values = values.fillna('')
+            try:
+                setattr(archive.data, name, values)
+            except (ValueError, TypeError):
+                if logger is not None:
+                    logger.error(
+                        'GreenlightParser tag not stored',
+                        tag=name,
+                        dtype=str(data[name].dtype),
+                    )
+                raise
+
+    def store_segments(
+        self, archive: 'EntryArchive', data, segment_statistics=None
+    ) -> None:
+        # Index of the file mark segments with statistics of key tags, unless
+        # already collected while reading
+        if 'file_mark' not in data.columns:
+            return
+        if segment_statistics is None:
+            segment_statistics = analysis.segment_statistics(data)
+        segments, statistics = segment_statistics
+        quantities = GreenlightSchemaPackage.m_def.all_quantities
+        tags = statistics.columns.get_level_values(0).unique()
+        for index, segment in enumerate(segments.itertuples(index=False)):
+            archive.data.segments.append(
+                Segment(
+                    label=segment.label,
+                    start_row=segment.start_row,
+                    end_row=segment.end_row,
+                    start_time=segment.start_time,
+                    end_time=segment.end_time,
+                    duration=segment.duration,
+                    statistics=[
+                        SegmentStatistics(
+                            tag=tag,
+                            unit=str(quantities[tag].unit),
+                            mean=statistics[tag, 'mean'].iloc[index],
+                            minimum=statistics[tag, 'min'].iloc[index],
+                            maximum=statistics[tag, 'max'].iloc[index],
+                            last=statistics[tag, 'last'].iloc[index],
+                        )
+                        for tag in tags
+                    ],
+                )
+            )
+
     def parse(
         self,
         mainfile: str,
@@ -34,28 +183,91 @@ class GreenlightParser(MatchingParser):
     ) -> None:
         if logger is not None:
             logger.info('GreenlightParser.parse', parameter=configuration.parameter)
+        timer = instrumentation.StageTimer(
+            'parser', trace_memory=configuration.trace_memory
+        )
+        profile_path = None
+        if configuration.profiler is not None:
+            profile_path = instrumentation.profile_path(
+                configuration.profile_directory,
+                mainfile,
+                'parser',
+                configuration.profiler,
+            )
+        with timer.activate():
+            with instrumentation.profile(configuration.profiler, profile_path, logger):
+                self.parse_mainfile(mainfile, archive, logger)
+        timer.log(logger)
+        if configuration.store_processing_metrics and archive.data is not None:
+            archive.data.store_processing_stages(timer)
 
+    def parse_mainfile(
+        self, mainfile: str, archive: 'EntryArchive', logger: 'BoundLogger'
+    ) -> None:
         # archive.workflow2 = Workflow(name='test')
-        data_file_object = rf.read_files(mainfile)
+        root_name, part_number = rf.split_part_name(mainfile)
+        part_files = []
+        if part_number is not None:
+            # The part with the lowest number owns the combined series entry
+            part_files = rf.list_part_files(mainfile, root_name)
+            if os.path.abspath(part_files[0]) != os.path.abspath(mainfile):
+                self.parse_series_part(mainfile, part_files[0], archive)
+                return
+        frame_cache = None
+        if configuration.cache_directory is not None:
+            frame_cache = get_frame_cache(
+                configuration.cache_directory, configuration.cache_max_size
+            )
+        with instrumentation.stage('read_files'):
+            data_file_object = rf.read_files(
+                mainfile,
+                max_workers=configuration.max_workers,
+                cache=frame_cache,
+                column_types=quantity_column_types(),
+                incremental=configuration.incremental,
+                memory_limit=configuration.memory_limit,
+                tag_selection=self.tag_selection(),
+            )
         data = data_file_object.data
+        if data_file_object.conversion_issues and logger is not None:
+            logger.warning(
+                'GreenlightParser unparsable values',
+                columns=data_file_object.conversion_issues,
+            )
+        if data_file_object.part_issues and logger is not None:
+            logger.warning(
+                'GreenlightParser discontinuous parts',
+                issues=data_file_object.part_issues,
+            )
+        if data_file_object.unknown_units and logger is not None:
+            logger.warning(
+                'GreenlightParser unknown units',
+                columns=data_file_object.unknown_units,
+            )
+        if frame_cache is not None and logger is not None:
+            logger.info(
+                'GreenlightParser frame cache',
+                hits=frame_cache.hits,
+                misses=frame_cache.misses,
+            )
 
         # archive.metadata.entry_name = os.path.basename(mainfile)
         # archive.metadata.external_id = data[0][1:]
         archive.data = GreenlightSchemaPackage()
-        print(archive.data.__dict__)
-
-        for name in data.columns:
-            if name in archive.data:
-                try:
-                    # print(archive.data, name, data[name].values[0])
-                    setattr(archive.data, name, data[name])
-                    # print(id(getattr(archive.data, name)))
-                except (ValueError, TypeError) as E:
-                    print(name)
-                    print(data[name])
-                    raise E
-        # print(archive.data.__dict__)
+
+        with instrumentation.stage('store_tags'):
+            self.store_tags(archive, mainfile, data, logger)
+        with instrumentation.stage('store_segments'):
+            self.store_segments(archive, data, data_file_object.segments)
         archive.data.name = data_file_object.header['Test Name']
+        archive.data.station_id = data_file_object.header.get('Station ID')
+        archive.data.start_time = data_file_object.start_time
+        if data_file_object.prefix_hash is not None:
+            archive.data.parsed_bytes = data_file_object.end_offset
+            archive.data.prefix_hash = data_file_object.prefix_hash
+        if part_files:
+            archive.data.part_number = part_number
+            archive.data.part_files = [os.path.basename(file) for file in part_files]
         # item = data_file_object.data['cell_voltage_total']
         # archive.data.cell_voltage = item
         # archive.data.cell_voltage.unit = data_file_object.units['cell_voltage_total']
@@ -1,81 +1,1073 @@
+import csv
+import fnmatch
+import hashlib
+import io
+import multiprocessing
 import os
-from operator import itemgetter
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache, partial
 
 import numpy as np
 import pandas as pd
-from echem_data import electrochem_data as ed
 
+from nomad_greenlight_plugin import analysis, instrumentation, units
 
-def reset_dtype(data_frame: pd.DataFrame):
-    for col, col_type in data_frame.dtypes.items():
-        if not isinstance(col_type, float):
-            try:
-                data_frame[col] = data_frame[col].astype(float)
-            except ValueError:
-                data_frame[col] = data_frame[col].astype(str)
-    return data_frame
+# Increase with every change of the parsed output to invalidate cached frames
+READER_VERSION = '6'
+HEADER_SEPARATOR = '-----'
+SECTION_SEPARATOR = '~-~-~'
+STRING_COLUMNS = ('time_stamp', 'file_mark')
+# Columns which are always read, independent of the tag selection
+REQUIRED_COLUMNS = ('time_stamp', 'elapsed_time', 'file_mark')
+# Named groups of tag patterns, usable in tag selections
+TAG_GROUPS = {
+    'scratch': ('variable_*',),
+    'scattergraph': ('scattergraph_*',),
+    'signals': ('signal_*',),
+    'valves': ('valve_*',),
+    'heaters': ('heater_*', 'heaters_*'),
+    'pressure_locks': ('pressure_*_lock_*', 'pressure_lock_*'),
+    'alarms': ('*_alarm', '*_alarm_disable', '*_warning', 'gisys_*'),
+    'eis': ('eis01_*',),
+    'cv': ('cv01_*',),
+}
+ENGINES = ('c', 'pyarrow')
+# Encoding of exports written with the Windows code page, e.g. '°C' as b'\xb0C'
+FALLBACK_ENCODING = 'cp1252'
+# Number of unparsable values reported per column
+MAX_EXAMPLES = 5
 
+START_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+EPOCH = datetime(1970, 1, 1)
+# Allowed deviation of time stamps from the elapsed time in seconds
+TIME_TOLERANCE = 1.0
+# Peak memory of reading a file at once relative to its size, the parsed
+# frame is copied several times while its columns are converted
+FULL_READ_FACTOR = 4
+# Memory of a chunk relative to the size of its rows, holding the text, the
+# parsed and the converted values
+CHUNK_MEMORY_FACTOR = 4
+MIN_CHUNK_ROWS = 1000
+# Approximate size of a string column value in bytes
+STRING_VALUE_SIZE = 64
+# Time between the parts of a series relative to the median row interval of
+# the earlier part, from which on the parts are reported as discontinuous
+GAP_FACTOR = 2.0
 
-def read_single_file(file_path, first_file_mark=None):
-    data_file_object = ed.EChemDataFile(file_path, 'Greenlight')
-    new_columns = {
-        col: col.lower().replace(' ', '_').replace('.', '_')
-        for col in data_file_object.data.columns
-    }
-    data_file_object.data.rename(columns=new_columns, inplace=True)
-    data = reset_dtype(data_file_object.data).copy()
-    data_file_object.units = {
-        new_columns[k]: v for k, v in data_file_object.units.items()
-    }
-    if first_file_mark is not None:
-        data.loc[0, 'file_mark'] = first_file_mark
-    file_mark = data['file_mark'].replace('', np.nan).ffill()
-    data['file_mark'] = file_mark
-    date_time = pd.to_datetime(data['time_stamp'])
-    nanoseconds = date_time.values.astype(np.int64)
-    seconds = nanoseconds * 1e-9
-    data['time'] = seconds
-    data_file_object.data = data.copy()
-    data_file_object.units['time'] = 's'
+
+class GreenlightDataFile:
+    def __init__(  # noqa: PLR0913
+        self,
+        data=None,
+        units=None,
+        header=None,
+        display_names=None,
+        conversion_issues=None,
+        *,
+        unknown_units=None,
+    ):
+        self.data = data
+        # pint units by column, see units.resolve_unit
+        self.units = units if units is not None else {}
+        # Unit strings of the columns which could not be resolved
+        self.unknown_units = unknown_units if unknown_units is not None else {}
+        self.header = header if header is not None else {}
+        self.display_names = display_names if display_names is not None else {}
+        self.conversion_issues = (
+            conversion_issues if conversion_issues is not None else {}
+        )
+        self.start_time = None
+        # Byte range of the parsed data rows and hash of the file up to its end
+        self.data_offset = None
+        self.end_offset = None
+        self.prefix_hash = None
+        # Segment index and statistics, if collected while reading
+        self.segments = None
+        # Gaps and overlaps between the parts of a series
+        self.part_issues = []
+
+
+def default_engine():
+    # Prefer the multithreaded pyarrow csv reader if it is installed
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return 'c'
+    return 'pyarrow'
+
+
+def column_name(tag: str):
+    return tag.strip().lower().replace(' ', '_').replace('.', '_')
+
+
+def split_row(line: bytes, encoding='utf-8'):
+    try:
+        text = line.decode(encoding)
+    except UnicodeDecodeError:
+        text = line.decode(FALLBACK_ENCODING, errors='replace')
+    return next(csv.reader([text.rstrip('\r\n')]))
+
+
+def read_preamble(file_handle, encoding='utf-8'):
+    # Consume the Emerald preamble (key/value header block, separators,
+    # display-name row, units row and tag-name row) line by line and leave the
+    # file handle positioned at the first data row. Returns the rows and the
+    # encoding of the file, the Windows code page if any preamble row is not
+    # valid in the given encoding.
+
+    def split(line):
+        nonlocal encoding
+        try:
+            line.decode(encoding)
+        except UnicodeDecodeError:
+            encoding = FALLBACK_ENCODING
+        return split_row(line, encoding)
+
+    header = {}
+    line = file_handle.readline()
+    while line and not line.startswith(HEADER_SEPARATOR.encode()):
+        row = split(line)
+        if row and row[0]:
+            header[row[0]] = row[1] if len(row) > 1 else ''
+        line = file_handle.readline()
+    if not line:
+        raise ValueError('Missing header separator in Greenlight file')
+    line = file_handle.readline()
+    if line.startswith(SECTION_SEPARATOR.encode()):
+        line = file_handle.readline()
+    display_names = split(line)
+    units = split(file_handle.readline())
+    tags = split(file_handle.readline())
+    if not tags or len(units) != len(tags) or len(display_names) != len(tags):
+        raise ValueError('Inconsistent column rows in Greenlight file')
+    return header, display_names, units, tags, encoding
+
+
+def expand_tag_patterns(patterns):
+    # Tag group names are replaced by the patterns of the group
+    expanded = []
+    for pattern in patterns:
+        expanded.extend(TAG_GROUPS.get(pattern, (pattern,)))
+    return expanded
+
+
+def select_columns(columns, tag_selection=None):
+    """
+    Columns kept by a tag selection, a dict of 'include' and 'exclude' lists
+    of tag names, glob patterns or names of TAG_GROUPS. Columns matching an
+    include pattern, or all columns without include patterns, are kept unless
+    they match an exclude pattern. The REQUIRED_COLUMNS are always kept.
+    """
+    if not tag_selection:
+        return list(columns)
+    include = expand_tag_patterns(tag_selection.get('include') or [])
+    exclude = expand_tag_patterns(tag_selection.get('exclude') or [])
+
+    def matches(col, patterns):
+        return any(fnmatch.fnmatchcase(col, pattern) for pattern in patterns)
+
+    return [
+        col
+        for col in columns
+        if col in REQUIRED_COLUMNS
+        or ((not include or matches(col, include)) and not matches(col, exclude))
+    ]
+
+
+def read_data_pyarrow(file_handle, columns, dtypes, usecols, encoding):
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    arrow_types = {'str': pa.string(), 'float64': pa.float64()}
+    table = pa_csv.read_csv(
+        file_handle,
+        read_options=pa_csv.ReadOptions(
+            column_names=columns, use_threads=True, encoding=encoding
+        ),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={col: arrow_types[dtype] for col, dtype in dtypes.items()},
+            include_columns=usecols,
+        ),
+    )
+    # Columns without any value are inferred as null type by pyarrow
+    for index, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(
+                index, field.name, pa.nulls(table.num_rows, type=pa.float64())
+            )
+    return table.to_pandas()
+
+
+def read_data(  # noqa: PLR0913
+    file_handle, columns, dtypes, engine, usecols, *, encoding='utf-8'
+):
+    # Only the columns in usecols are decoded. pyarrow cannot infer the
+    # columns of a file without any data rows.
+    if engine == 'pyarrow' and file_handle.peek(1):
+        return read_data_pyarrow(file_handle, columns, dtypes, usecols, encoding)
+    return pd.read_csv(
+        file_handle,
+        header=None,
+        names=columns,
+        usecols=usecols,
+        dtype={col: str if dtype == 'str' else dtype for col, dtype in dtypes.items()},
+        engine='c',
+        encoding=encoding,
+    )
+
+
+def convert_dtypes(data, column_types, string_columns):
+    # Coerce all columns which are not parsed as numbers to float in one
+    # vectorized step and report the values which could not be converted.
+    # Float tags inferred as integers are cast to float.
+    conversion_issues = {}
+    integer_columns = [
+        col
+        for col in data.columns
+        if column_types.get(col) == 'float64'
+        and pd.api.types.is_integer_dtype(data[col].dtype)
+    ]
+    if integer_columns:
+        data[integer_columns] = data[integer_columns].astype('float64')
+    object_columns = [
+        col
+        for col in data.columns
+        if data[col].dtype == object
+        and col not in string_columns
+        and column_types.get(col) != 'str'
+    ]
+    if not object_columns:
+        return conversion_issues
+    values = data[object_columns]
+    numeric = values.apply(pd.to_numeric, errors='coerce').astype(float)
+    invalid = numeric.isna() & values.notna()
+    invalid_counts = invalid.sum()
+    for col in invalid_counts[invalid_counts > 0].index:
+        if col not in column_types and not numeric[col].notna().any():
+            # Unknown text columns are kept as strings
+            numeric[col] = values[col]
+        conversion_issues[col] = dict(
+            count=int(invalid_counts[col]),
+            examples=[
+                str(value)
+                for value in values[col][invalid[col]].unique()[:MAX_EXAMPLES]
+            ],
+        )
+    data[object_columns] = numeric
+    return conversion_issues
+
+
+def read_greenlight_file(  # noqa: PLR0913
+    file_path,
+    engine=None,
+    column_types=None,
+    *,
+    start=None,
+    end=None,
+    tag_selection=None,
+):
+    if engine is None:
+        engine = default_engine()
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown csv engine: {engine}')
+    if column_types is None:
+        column_types = {}
+    with open(file_path, 'rb') as file_handle:
+        header, display_names, unit_names, tags, encoding = read_preamble(file_handle)
+        columns = [column_name(tag) for tag in tags]
+        usecols = select_columns(columns, tag_selection)
+        string_columns = [
+            col
+            for col in usecols
+            if col in STRING_COLUMNS or column_types.get(col) == 'str'
+        ]
+        # Numeric columns are inferred rather than read as float64, so that an
+        # unparsable value never fails the read. Only the columns holding
+        # one are returned as text, these are coerced by convert_dtypes.
+        dtypes = {col: 'str' for col in string_columns}
+        data_offset = file_handle.tell()
+        data_handle = file_handle
+        if start is not None or end is not None:
+            # Only the data rows in the byte range from start to end
+            file_handle.seek(data_offset if start is None else start)
+            size = -1 if end is None else end - file_handle.tell()
+            data_handle = io.BufferedReader(io.BytesIO(file_handle.read(size)))
+        with instrumentation.stage('read_csv'):
+            data = read_data(
+                data_handle, columns, dtypes, engine, usecols, encoding=encoding
+            )
+    with instrumentation.stage('convert_dtypes'):
+        for col in string_columns:
+            data[col] = data[col].fillna('')
+        conversion_issues = convert_dtypes(data, column_types, string_columns)
+    selected = set(usecols)
+    resolved_units, unknown_units = units.resolve_units(
+        {col: unit for col, unit in zip(columns, unit_names) if col in selected}
+    )
+    data_file_object = GreenlightDataFile(
+        data=data,
+        units=resolved_units,
+        header=header,
+        display_names={
+            col: display_name
+            for col, display_name in zip(columns, display_names)
+            if col in selected
+        },
+        conversion_issues=conversion_issues,
+        unknown_units=unknown_units,
+    )
+    data_file_object.data_offset = data_offset
+    data_file_object.end_offset = os.path.getsize(file_path) if end is None else end
     return data_file_object
 
 
-def read_multiple_files_and_combine(mainfile, root_name, split_char='_'):
-    dir_path = os.path.dirname(mainfile)
-    file_list = [file for file in os.listdir(dir_path) if root_name in file]
-    sorted_file_list = sorted(
-        file_list, key=lambda x: itemgetter(-1)(x.split(split_char))
-    )
-    first_file_mark = None
-    data_file_objects = []
-    for file in sorted_file_list:
-        data_file_object = read_single_file(mainfile, first_file_mark)
-        first_file_mark = data_file_object.data['file_mark'].iloc[-1]
-        print(first_file_mark)
-        data_file_object.data.set_index('time', inplace=True)
-        data_file_objects.append(data_file_object)
-    data_frame = pd.concat([dfo.data for dfo in data_file_objects], join='outer')
-    data_frame = data_frame.reset_index()
-    data_file_object = data_file_objects[0]
-    data_file_object.data = data_frame
+def time_stamps_to_milliseconds(time_stamps):
+    # Time stamps as integer milliseconds since the epoch and the rows of
+    # unparsable time stamps
+    date_time = pd.to_datetime(time_stamps, format='ISO8601', errors='coerce')
+    invalid = date_time.isna().to_numpy()
+    milliseconds = date_time.to_numpy().astype('datetime64[ms]').astype(np.int64)
+    milliseconds[invalid] = 0
+    return milliseconds, invalid
+
+
+def time_column(time_stamps, header, elapsed_time=None):
+    # Time in seconds relative to the start time given in the header, the
+    # start time and the rows with invalid or inconsistent time stamps
+    milliseconds, invalid = time_stamps_to_milliseconds(time_stamps)
+    try:
+        start_time = datetime.strptime(header['Start Time'], START_TIME_FORMAT)
+    except (KeyError, ValueError):
+        start_time = None
+    if start_time is not None:
+        start = (start_time - EPOCH) // timedelta(milliseconds=1)
+    elif (~invalid).any():
+        start = int(milliseconds[~invalid][0])
+        start_time = EPOCH + timedelta(milliseconds=start)
+    else:
+        start = 0
+    time = (milliseconds - start) / 1000
+    time[invalid] = np.nan
+    issues = invalid.copy()
+    if elapsed_time is not None and (~invalid).any():
+        # Validate against the elapsed time, which may have a constant offset
+        deviation = time - elapsed_time
+        if np.isfinite(deviation).any():
+            offset = np.nanmedian(deviation)
+            issues |= np.abs(deviation - offset) > TIME_TOLERANCE
+    return time, start_time, issues
+
+
+def time_issue(time_stamps, issues):
+    return dict(
+        count=int(issues.sum()),
+        examples=[str(value) for value in time_stamps[issues][:MAX_EXAMPLES]],
+    )
+
+
+def calculate_time(data_file_object):
+    data = data_file_object.data
+    time, start_time, issues = time_column(
+        data['time_stamp'],
+        data_file_object.header,
+        elapsed_time=(
+            data['elapsed_time'].to_numpy() if 'elapsed_time' in data.columns else None
+        ),
+    )
+    if issues.any():
+        data_file_object.conversion_issues['time_stamp'] = time_issue(
+            data['time_stamp'], issues
+        )
+    data['time'] = time
+    data_file_object.units['time'] = 'second'
+    data_file_object.start_time = start_time
     return data_file_object
 
 
-def read_files(mainfile):
-    split_char = '_'
-    file_name = os.path.basename(mainfile)
-    sub_names = file_name.split('.')[-2].split(split_char)
+def fill_file_marks(file_marks, previous=np.nan):
+    # File marks are only written when they change. Every row gets the last
+    # mark written up to it, the rows before the first mark the previous one.
+    file_marks = np.asarray(file_marks, dtype=object)
+    last = np.maximum.accumulate(
+        np.where(file_marks != '', np.arange(len(file_marks)), -1)
+    )
+    return np.where(last >= 0, file_marks[last], previous)
+
+
+def read_single_file(  # noqa: PLR0913
+    file_path,
+    first_file_mark=None,
+    engine=None,
+    column_types=None,
+    *,
+    start=None,
+    end=None,
+    tag_selection=None,
+):
+    data_file_object = read_greenlight_file(
+        file_path,
+        engine=engine,
+        column_types=column_types,
+        start=start,
+        end=end,
+        tag_selection=tag_selection,
+    )
+    data = data_file_object.data
+    if first_file_mark is not None and len(data) > 0:
+        data.loc[0, 'file_mark'] = first_file_mark
+    data['file_mark'] = fill_file_marks(data['file_mark'])
+    with instrumentation.stage('calculate_time'):
+        return calculate_time(data_file_object)
+
+
+def split_part_name(file_name, split_char='_'):
+    # Split e.g. 'test - part_12.csv' into its root name and part number
+    sub_names = os.path.splitext(os.path.basename(file_name))[0].split(split_char)
     root_name = split_char.join(sub_names[:-1])
     try:
-        file_number = int(sub_names[-1])
+        part_number = int(sub_names[-1])
     except ValueError:
-        file_number = None
+        part_number = None
+    return root_name, part_number
+
+
+@lru_cache(maxsize=16)
+def build_directory_index(dir_path, split_char, modification_time, extension='.csv'):
+    # Only files with the extension of the parts are indexed, other files
+    # like HDF5 sidecars may share the name pattern
+    series = {}
+    for file in os.listdir(dir_path):
+        if os.path.splitext(file)[1].lower() != extension:
+            continue
+        root_name, part_number = split_part_name(file, split_char)
+        if part_number is not None:
+            series.setdefault(root_name, []).append(
+                (part_number, os.path.join(dir_path, file))
+            )
+    return {
+        root_name: [file_path for _, file_path in sorted(parts)]
+        for root_name, parts in series.items()
+    }
+
+
+def directory_index(dir_path, split_char='_', extension='.csv'):
+    # The index of all multi-part series in a directory is built once and
+    # reused for all parts until the directory changes
+    dir_path = os.path.abspath(dir_path)
+    modification_time = os.stat(dir_path).st_mtime_ns
+    return build_directory_index(
+        dir_path, split_char, modification_time, extension.lower()
+    )
+
+
+def list_part_files(mainfile, root_name, split_char='_'):
+    dir_path = os.path.dirname(mainfile) or os.curdir
+    extension = os.path.splitext(mainfile)[1]
+    return directory_index(dir_path, split_char, extension).get(root_name, [])
+
+
+def read_header(file_path):
+    with open(file_path, 'rb') as file_handle:
+        header, _, _, _, _ = read_preamble(file_handle)
+    return header
+
+
+def read_part_files(
+    file_paths, max_workers=None, column_types=None, *, tag_selection=None
+):
+    # Parts are parsed independently, in a process pool if possible. Child
+    # processes cannot be started from daemonic worker processes.
+    read_part = partial(
+        read_single_file, column_types=column_types, tag_selection=tag_selection
+    )
+    if (
+        len(file_paths) <= 1
+        or max_workers == 1
+        or multiprocessing.current_process().daemon
+    ):
+        return [read_part(file_path) for file_path in file_paths]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(file_paths))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read_part, file_paths))
+
+
+def add_conversion_issues(conversion_issues, issues):
+    for col, issue in issues.items():
+        merged = conversion_issues.setdefault(col, dict(count=0, examples=[]))
+        merged['count'] += issue['count']
+        for example in issue['examples']:
+            if example not in merged['examples'] and len(merged['examples']) < (
+                MAX_EXAMPLES
+            ):
+                merged['examples'].append(example)
+    return conversion_issues
+
+
+def merge_conversion_issues(data_file_objects):
+    conversion_issues = {}
+    for data_file_object in data_file_objects:
+        add_conversion_issues(conversion_issues, data_file_object.conversion_issues)
+    return conversion_issues
+
+
+def merge_units(data_file_objects):
+    # Units of the columns of all parts, the first part taking precedence
+    resolved_units, unknown_units = {}, {}
+    for data_file_object in data_file_objects:
+        for col, unit in data_file_object.units.items():
+            resolved_units.setdefault(col, unit)
+        for col, unit in data_file_object.unknown_units.items():
+            unknown_units.setdefault(col, unit)
+    return resolved_units, unknown_units
+
+
+def carry_file_marks(data_file_objects):
+    # Leading rows without file mark continue the last file mark of the
+    # previous part
+    last_file_mark = np.nan
+    for data_file_object in data_file_objects:
+        file_mark = data_file_object.data['file_mark']
+        if file_mark.isna().any():
+            data_file_object.data['file_mark'] = file_mark.fillna(last_file_mark)
+        if len(file_mark) > 0:
+            last_file_mark = data_file_object.data['file_mark'].iloc[-1]
+    return data_file_objects
+
+
+def merge_positions(part_times):
+    """
+    Output rows of the rows of time-sorted parts merged by time, together with
+    the gaps and overlaps between consecutive parts. Rows of a later part
+    repeating a time of an earlier part are dropped, their position is -1.
+    The positions are None if the parts follow each other, as usual, and are
+    simply concatenated.
+    """
+    part_issues = []
+    end = interval = None
+    for part, part_time in enumerate(part_times):
+        if len(part_time) == 0:
+            continue
+        start = float(part_time[0])
+        if end is not None and start <= end:
+            part_issues.append(dict(part=part, kind='overlap', start=start, end=end))
+        elif end is not None and interval and start - end > GAP_FACTOR * interval:
+            part_issues.append(dict(part=part, kind='gap', start=end, end=start))
+        if len(part_time) > 1:
+            interval = float(np.median(np.diff(part_time)))
+        end = max(float(part_time[-1]), start if end is None else end)
+    if not any(issue['kind'] == 'overlap' for issue in part_issues):
+        return None, part_issues
+    times = np.concatenate(part_times)
+    part_ids = np.repeat(
+        np.arange(len(part_times)), [len(part_time) for part_time in part_times]
+    )
+    # Sorted runs are merged by the stable sort in linear time per run, rows
+    # of earlier parts come first among rows of the same time
+    order = np.argsort(times, kind='stable')
+    sorted_times, sorted_parts = times[order], part_ids[order]
+    run_starts = np.ones(len(order), dtype=bool)
+    run_starts[1:] = sorted_times[1:] != sorted_times[:-1]
+    first_parts = sorted_parts[run_starts][np.cumsum(run_starts) - 1]
+    duplicate = sorted_parts != first_parts
+    positions = np.full(len(order), -1)
+    kept = order[~duplicate]
+    positions[kept] = np.arange(len(kept))
+    duplicates = np.bincount(sorted_parts[duplicate], minlength=len(part_times))
+    for issue in part_issues:
+        if issue['kind'] == 'overlap':
+            issue['duplicates'] = int(duplicates[issue['part']])
+    return positions, part_issues
+
+
+def merged_dtype(dtypes, complete):
+    # Type of a merged column, rows of parts without the column are NaN
+    if not all(isinstance(dtype, np.dtype) for dtype in dtypes):
+        return np.dtype(object)
+    if not complete:
+        dtypes = [*dtypes, np.dtype('float64')]
+    return np.result_type(*dtypes)
+
+
+def merge_parts(frames, positions=None):
+    """
+    Frame of the rows of the parts at their merge positions, the time column
+    first. Every output column is allocated once and filled part by part.
+    """
+    offsets = np.cumsum([0, *(len(frame) for frame in frames)])
+    if positions is None:
+        row_count = offsets[-1]
+        targets = [slice(start, stop) for start, stop in zip(offsets, offsets[1:])]
+    else:
+        row_count = np.count_nonzero(positions >= 0)
+        targets = [positions[start:stop] for start, stop in zip(offsets, offsets[1:])]
+    columns = list(
+        dict.fromkeys(['time', *(col for frame in frames for col in frame.columns)])
+    )
+    merged = {}
+    for col in columns:
+        parts = [
+            (frame[col].to_numpy(), target)
+            for frame, target in zip(frames, targets)
+            if col in frame.columns
+        ]
+        complete = len(parts) == len(frames)
+        dtype = merged_dtype([values.dtype for values, _ in parts], complete)
+        if complete:
+            values = np.empty(row_count, dtype=dtype)
+        else:
+            values = np.full(row_count, np.nan, dtype=dtype)
+        for part_values, target in parts:
+            if isinstance(target, slice):
+                values[target] = part_values
+            else:
+                kept = target >= 0
+                values[target[kept]] = part_values[kept]
+        merged[col] = values
+    return pd.DataFrame(merged, copy=False)
+
+
+def read_multiple_files_and_combine(
+    file_list, max_workers=None, column_types=None, *, tag_selection=None
+):
+    data_file_objects = carry_file_marks(
+        read_part_files(
+            file_list,
+            max_workers=max_workers,
+            column_types=column_types,
+            tag_selection=tag_selection,
+        )
+    )
+    conversion_issues = merge_conversion_issues(data_file_objects)
+    resolved_units, unknown_units = merge_units(data_file_objects)
+    start_time = data_file_objects[0].start_time
+    for data_file_object in data_file_objects:
+        # Time of all parts relative to the start of the first part
+        if (
+            start_time is not None
+            and data_file_object.start_time is not None
+            and data_file_object.start_time != start_time
+        ):
+            shift = (data_file_object.start_time - start_time).total_seconds()
+            data_file_object.data['time'] += shift
+    frames = [dfo.data for dfo in data_file_objects]
+    with instrumentation.stage('merge_parts'):
+        positions, part_issues = merge_positions(
+            [frame['time'].to_numpy() for frame in frames]
+        )
+        data_frame = merge_parts(frames, positions)
+    data_file_object = data_file_objects[0]
+    data_file_object.data = data_frame
+    data_file_object.conversion_issues = conversion_issues
+    data_file_object.part_issues = part_issues
+    data_file_object.units = resolved_units
+    data_file_object.unknown_units = unknown_units
+    return data_file_object
+
+
+def count_rows(file_path, offset):
+    # Number of lines from the offset to the end of the file
+    count = 0
+    last = b'\n'
+    with open(file_path, 'rb') as file:
+        file.seek(offset)
+        for chunk in iter(lambda: file.read(1024**2), b''):
+            count += chunk.count(b'\n')
+            last = chunk[-1:]
+    return count + (last != b'\n')
+
+
+def read_part_layouts(file_paths, tag_selection=None):
+    parts = []
+    for file_path in file_paths:
+        with open(file_path, 'rb') as file_handle:
+            header, display_names, unit_names, tags, encoding = read_preamble(
+                file_handle
+            )
+            data_offset = file_handle.tell()
+        names = [column_name(tag) for tag in tags]
+        selected = set(select_columns(names, tag_selection))
+        parts.append(
+            dict(
+                file_path=file_path,
+                header=header,
+                names=names,
+                columns=[col for col in names if col in selected],
+                units=[unit for col, unit in zip(names, unit_names) if col in selected],
+                display_names=[
+                    display_name
+                    for col, display_name in zip(names, display_names)
+                    if col in selected
+                ],
+                data_offset=data_offset,
+                encoding=encoding,
+                row_count=count_rows(file_path, data_offset),
+            )
+        )
+    return parts
+
+
+def chunk_rows(part, memory_limit):
+    # Rows per chunk so that a parsed chunk fits into the memory limit
+    size = os.path.getsize(part['file_path']) - part['data_offset']
+    row_size = max(size / max(part['row_count'], 1), 8 * len(part['names']))
+    return max(MIN_CHUNK_ROWS, int(memory_limit // (CHUNK_MEMORY_FACTOR * row_size)))
+
+
+class ChunkedColumns:
+    """
+    Pre-sized columns which the chunks of a chunked read are written into.
+    Numeric columns which do not fit into half of the memory limit are backed
+    by an anonymous temporary file.
+    """
+
+    def __init__(self, columns, string_columns, row_count, memory_limit):
+        self.columns = columns
+        self.row_count = row_count
+        self.numeric_columns = [col for col in columns if col not in string_columns]
+        self.numeric_index = {col: i for i, col in enumerate(self.numeric_columns)}
+        shape = (len(self.numeric_columns), row_count)
+        numeric_size = 8 * shape[0] * shape[1]
+        if numeric_size > memory_limit // 2:
+            self.numeric = np.memmap(
+                tempfile.TemporaryFile(), dtype='float64', mode='w+', shape=shape
+            )
+            numeric_size = 0
+        else:
+            self.numeric = np.empty(shape)
+        self.strings = {
+            col: np.empty(row_count, dtype=object) for col in string_columns
+        }
+        # Columns of only text values, kept if no chunk holds numbers
+        self.texts = {}
+        self.size = numeric_size + STRING_VALUE_SIZE * len(string_columns) * row_count
+
+    def column(self, col, start, stop):
+        if col in self.strings:
+            return self.strings[col][start:stop]
+        return self.numeric[self.numeric_index[col], start:stop]
+
+    def write(self, chunk, start):
+        stop = start + len(chunk)
+        for col in chunk.columns:
+            values = chunk[col].to_numpy()
+            if col in self.strings or values.dtype != object:
+                self.column(col, start, stop)[:] = values
+                continue
+            text = self.texts.get(col)
+            if text is None:
+                text = np.full(self.row_count, np.nan, dtype=object)
+                self.texts[col] = text
+            text[start:stop] = values
+            self.column(col, start, stop)[:] = np.nan
+
+    def clear(self, columns, start, stop):
+        # Columns missing in a part are empty, as in an outer join
+        for col in columns:
+            self.column(col, start, stop)[:] = np.nan
+
+    def frame(self, row_count):
+        # Blank lines are counted but not read
+        numeric = self.numeric[:, :row_count]
+        data = pd.DataFrame(numeric.T, columns=self.numeric_columns, copy=False)
+        for col, values in self.texts.items():
+            if np.isnan(numeric[self.numeric_index[col]]).all():
+                data[col] = values[:row_count]
+        for col, values in self.strings.items():
+            data.insert(self.columns.index(col), col, values[:row_count])
+        return data
+
+
+def read_part_chunks(part, output, start, state, column_types):
+    """
+    Reads the rows of one part in chunks into the output columns from the
+    start row on and returns the row after the part. The state carries the
+    file mark, conversion issues and segment accumulator across parts.
+    """
+    row = start
+    strings = [col for col in part['columns'] if col in output.strings]
+    with open(part['file_path'], 'rb') as file_handle:
+        file_handle.seek(part['data_offset'])
+        reader = pd.read_csv(
+            file_handle,
+            header=None,
+            names=part['names'],
+            usecols=part['columns'],
+            dtype={col: str for col in strings},
+            engine='c',
+            encoding=part['encoding'],
+            chunksize=chunk_rows(part, max(state['memory_limit'] - output.size, 0)),
+        )
+        for chunk in reader:
+            with instrumentation.stage('convert_dtypes'):
+                for col in strings:
+                    chunk[col] = chunk[col].fillna('')
+                add_conversion_issues(
+                    state['conversion_issues'],
+                    convert_dtypes(chunk, column_types, strings),
+                )
+            if 'file_mark' in chunk.columns and len(chunk) > 0:
+                file_mark = fill_file_marks(chunk['file_mark'], state['file_mark'])
+                chunk['file_mark'] = file_mark
+                state['file_mark'] = file_mark[-1]
+            output.write(chunk, row)
+            if state['accumulator'] is not None:
+                state['accumulator'].update(chunk)
+            row += len(chunk)
+    output.clear(
+        [col for col in output.columns if col not in part['columns']], start, row
+    )
+    return row
+
+
+def read_chunked(file_paths, memory_limit, column_types=None, *, tag_selection=None):
+    """
+    Reads a Greenlight file or the parts of a multi-part series in chunks of
+    rows, which are converted and written into pre-sized columns so that the
+    memory used stays below memory_limit bytes. The segment index and
+    statistics are collected while reading. Returns the same frame as
+    read_single_file or read_multiple_files_and_combine.
+    """
+    if column_types is None:
+        column_types = {}
+    parts = read_part_layouts(file_paths, tag_selection)
+    unit_names, display_names = {}, {}
+    for part in parts:
+        for col, unit, display_name in zip(
+            part['columns'], part['units'], part['display_names']
+        ):
+            unit_names.setdefault(col, unit)
+            display_names.setdefault(col, display_name)
+    columns = list(unit_names)
+    row_count = sum(part['row_count'] for part in parts)
+    output = ChunkedColumns(
+        columns,
+        [
+            col
+            for col in columns
+            if col in STRING_COLUMNS or column_types.get(col) == 'str'
+        ],
+        row_count,
+        memory_limit,
+    )
+    state = dict(
+        memory_limit=memory_limit,
+        conversion_issues={},
+        file_mark=np.nan,
+        accumulator=(analysis.SegmentAccumulator() if 'file_mark' in columns else None),
+    )
+    time = np.empty(row_count)
+    start_time = None
+    row = 0
+    part_starts = [0]
+    for part in parts:
+        start = row
+        row = read_part_chunks(part, output, start, state, column_types)
+        part_starts.append(row)
+        time_stamps = pd.Series(output.column('time_stamp', start, row), copy=False)
+        part_time, part_start_time, issues = time_column(
+            time_stamps,
+            part['header'],
+            elapsed_time=(
+                output.column('elapsed_time', start, row)
+                if 'elapsed_time' in part['columns']
+                else None
+            ),
+        )
+        if issues.any():
+            add_conversion_issues(
+                state['conversion_issues'],
+                dict(time_stamp=time_issue(time_stamps, issues)),
+            )
+        if part is parts[0]:
+            start_time = part_start_time
+        elif (
+            start_time is not None
+            and part_start_time is not None
+            and part_start_time != start_time
+        ):
+            # Time of all parts relative to the start of the first part
+            part_time += (part_start_time - start_time).total_seconds()
+        time[start:row] = part_time
+    data = output.frame(row)
+    if len(parts) > 1:
+        data.insert(0, 'time', time[:row])
+    else:
+        data['time'] = time[:row]
+    positions, part_issues = merge_positions(
+        [time[start:stop] for start, stop in zip(part_starts, part_starts[1:])]
+    )
+    if positions is not None:
+        # Overlapping parts are reordered after reading, the segments are
+        # collected again from the merged rows
+        kept = positions >= 0
+        order = np.empty(np.count_nonzero(kept), dtype=int)
+        order[positions[kept]] = np.flatnonzero(kept)
+        data = data.take(order).reset_index(drop=True)
+        state['accumulator'] = None
+    resolved_units, unknown_units = units.resolve_units(unit_names)
+    resolved_units['time'] = 'second'
+    data_file_object = GreenlightDataFile(
+        data=data,
+        units=resolved_units,
+        header=parts[0]['header'],
+        display_names=display_names,
+        conversion_issues=state['conversion_issues'],
+        unknown_units=unknown_units,
+    )
+    data_file_object.start_time = start_time
+    data_file_object.part_issues = part_issues
+    if state['accumulator'] is not None:
+        data_file_object.segments = state['accumulator'].result(time[:row])
+    return data_file_object
+
+
+def encode_run_lengths(data, columns, max_fraction):
+    # Change indices and values of the columns with at most max_fraction of
+    # the rows starting a new run, NaN runs count as unchanged
+    if len(data) == 0 or not columns:
+        return {}
+    values = data[columns].to_numpy(dtype='float64')
+    previous, current = values[:-1], values[1:]
+    changed = (previous != current) & ~(np.isnan(previous) & np.isnan(current))
+    run_counts = changed.sum(axis=0) + 1
+    max_runs = max(1, int(max_fraction * len(data)))
+    encoded = {}
+    for index in np.flatnonzero(run_counts <= max_runs):
+        change_indices = np.concatenate(([0], np.flatnonzero(changed[:, index]) + 1))
+        encoded[columns[index]] = (change_indices, values[change_indices, index])
+    return encoded
+
+
+def complete_size(file_path):
+    # Size of the file up to and including its last line break, a partly
+    # written last row of a running test is left for the next read
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as file:
+        position = size
+        while position > 0:
+            chunk_start = max(0, position - 64 * 1024)
+            file.seek(chunk_start)
+            index = file.read(position - chunk_start).rfind(b'\n')
+            if index >= 0:
+                return chunk_start + index + 1
+            position = chunk_start
+    return 0
+
+
+def complete_row(file_path, start, end):
+    # Whether an unterminated last row holds all columns, a row still being
+    # written by a running test does not
+    with open(file_path, 'rb') as file:
+        _, _, _, tags, encoding = read_preamble(file)
+        file.seek(start)
+        return len(split_row(file.read(end - start), encoding)) == len(tags)
+
+
+def file_prefix_hash(file_path, size):
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        remaining = size
+        while remaining > 0:
+            chunk = file.read(min(remaining, 1024**2))
+            if not chunk:
+                break
+            file_hash.update(chunk)
+            remaining -= len(chunk)
+    return file_hash.hexdigest()
+
+
+def append_rows(data_file_object, file_path, start, end, read_options):
+    # Append the rows in the byte range from start to end of the file
+    appended = read_single_file(file_path, start=start, end=end, **read_options)
+    carry_file_marks([data_file_object, appended])
+    data_file_object.conversion_issues = merge_conversion_issues(
+        [data_file_object, appended]
+    )
+    data_file_object.data = pd.concat(
+        [data_file_object.data, appended.data], ignore_index=True
+    )
+    return data_file_object
+
+
+def read_incremental(mainfile, cache, column_types=None, *, tag_selection=None):
+    """
+    Reads a stand-alone file which may still grow. Only the rows appended since
+    the last read of the same path are parsed, if the file up to the end of
+    that read is unchanged, otherwise the whole file is read. An unterminated
+    last row is returned if complete, but parsed again with the next read.
+    """
+    read_options = dict(column_types=column_types, tag_selection=tag_selection)
+    size = os.path.getsize(mainfile)
+    end = complete_size(mainfile)
+    key = cache.path_key(mainfile, options=read_options)
+    data_file_object = cache.load(key)
+    if (
+        data_file_object is not None
+        and data_file_object.end_offset is not None
+        and data_file_object.end_offset <= end
+        and file_prefix_hash(mainfile, data_file_object.end_offset)
+        == data_file_object.prefix_hash
+    ):
+        if data_file_object.end_offset < end:
+            append_rows(
+                data_file_object,
+                mainfile,
+                data_file_object.end_offset,
+                end,
+                read_options,
+            )
+    else:
+        data_file_object = read_single_file(mainfile, end=end, **read_options)
+    if data_file_object.prefix_hash is None or data_file_object.end_offset != end:
+        data_file_object.end_offset = end
+        data_file_object.prefix_hash = file_prefix_hash(mainfile, end)
+        cache.store(key, data_file_object)
+    if end < size and complete_row(mainfile, end, size):
+        append_rows(data_file_object, mainfile, end, size, read_options)
+    return data_file_object
+
+
+def read_files(  # noqa: PLR0913
+    mainfile,
+    max_workers=None,
+    cache=None,
+    column_types=None,
+    incremental=False,
+    *,
+    memory_limit=None,
+    tag_selection=None,
+):
+    split_char = '_'
+    root_name, file_number = split_part_name(mainfile, split_char)
+    read_options = dict(column_types=column_types, tag_selection=tag_selection)
+    if incremental and cache is not None and file_number is None:
+        return read_incremental(mainfile, cache, **read_options)
+    file_list = [mainfile]
     if file_number is not None:
+        file_list = list_part_files(mainfile, root_name, split_char=split_char)
+    if cache is not None:
+        cache_key = cache.key(file_list, options=read_options)
+        data_file_object = cache.load(cache_key)
+        if data_file_object is not None:
+            return data_file_object
+    if (
+        memory_limit is not None
+        and FULL_READ_FACTOR
+        * sum(os.path.getsize(file_path) for file_path in file_list)
+        > memory_limit
+    ):
+        # Stream the rows into pre-sized columns
+        data_file_object = read_chunked(file_list, memory_limit, **read_options)
+    elif file_number is not None:
         # Load multiple files
         data_file_object = read_multiple_files_and_combine(
-            mainfile, root_name, split_char=split_char
+            file_list, max_workers=max_workers, **read_options
         )
     else:
         # Load stand-alone file
-        data_file_object = read_single_file(mainfile)
+        data_file_object = read_single_file(mainfile, **read_options)
+    if cache is not None:
+        cache.store(cache_key, data_file_object)
     return data_file_object
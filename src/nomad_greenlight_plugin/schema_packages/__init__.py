@@ -1,9 +1,68 @@
+from typing import Literal, Optional
+
 from nomad.config.models.plugins import SchemaPackageEntryPoint
 from pydantic import Field
 
 
 class GreenlightSchemaPackageEntryPoint(SchemaPackageEntryPoint):
     parameter: int = Field(0, description='Custom configuration parameter')
+    plot_max_points: int = Field(
+        2000,
+        description='Maximum number of points per trace of the plots, longer '
+        'series are decimated keeping the minimum and maximum of each bucket',
+    )
+    polarization_min_duration: float = Field(
+        30.0,
+        description='Minimum duration in seconds of a current setpoint plateau '
+        'taken as point of the polarization curve',
+    )
+    polarization_settling_fraction: float = Field(
+        0.5,
+        description='Leading fraction of a plateau discarded as settling time '
+        'before averaging',
+    )
+    eis_min_points: int = Field(
+        3, description='Minimum number of points of an EIS sweep'
+    )
+    cv_file_mark_pattern: str = Field(
+        '(?<![a-z])cv',
+        description='Case insensitive regular expression of the file marks of '
+        'cyclic voltammetry runs, used if the cv01_start flag is never set',
+    )
+    cv_apex_tolerance: float = Field(
+        0.05,
+        description='Largest distance of a scan reversal from an apex voltage, '
+        'relative to the span between the apexes',
+    )
+    polarization_tolerance: float = Field(
+        0.005,
+        description='Largest change of the current setpoint between rows of a '
+        'plateau, relative to the largest setpoint',
+    )
+    ocv_max_current_density: float = Field(
+        0.005,
+        description='Largest absolute current density in A/cm² of the rows '
+        'averaged for the open circuit voltage of the test summary',
+    )
+    store_processing_metrics: bool = Field(
+        False,
+        description='Store the time and memory of the normalize stages in the '
+        'processing_stages of the entry, they are always logged',
+    )
+    trace_memory: bool = Field(
+        False,
+        description='Trace the peak memory of the normalize stages with '
+        'tracemalloc, which slows down the normalization',
+    )
+    profiler: Optional[Literal['cprofile', 'pyinstrument']] = Field(
+        None,
+        description='Profile the normalization with cProfile or pyinstrument '
+        '(optional dependency)',
+    )
+    profile_directory: Optional[str] = Field(
+        None,
+        description='Directory of the profiles, the temporary directory if not set',
+    )
 
     def load(self):
         from nomad_greenlight_plugin.schema_packages.schema_package import m_package
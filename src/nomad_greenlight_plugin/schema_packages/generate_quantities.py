@@ -0,0 +1,84 @@
+"""
+Generates the time series quantities of GreenlightSchemaPackage from the
+empty Greenlight template file. Run after changing the template or the reader:
+
+    python -m nomad_greenlight_plugin.schema_packages.generate_quantities
+"""
+
+import os
+
+import numpy as np
+from nomad.metainfo import Quantity
+
+from nomad_greenlight_plugin import read_files as rf
+
+TEMPLATE_FILE = os.path.join(os.path.dirname(__file__), 'greenlight_empty.csv')
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), 'schema_package.py')
+BEGIN_MARKER = '    # generate_quantities.py, do not edit by hand\n'
+END_MARKER = '    # End of generated quantities\n'
+LINE_LENGTH = 88
+INDENT = ' ' * 4
+
+
+def make_quantity_dict():
+    # Initialize all data quantities from empty template csv file
+    data_file_object = rf.read_single_file(TEMPLATE_FILE)
+    if data_file_object.unknown_units:
+        # Extend units.UNIT_ALIASES rather than guessing a unit
+        raise ValueError(
+            f'Unknown units in the template: {data_file_object.unknown_units}'
+        )
+    df = data_file_object.data
+    type_dict = df.dtypes.to_dict()
+    for k, v in type_dict.items():
+        if isinstance(v, np.dtypes.ObjectDType):
+            type_dict[k] = str
+    return {
+        col: Quantity(
+            type=type_dict[col], shape=['*'], unit=data_file_object.units[col]
+        )
+        for col in df.columns
+    }
+
+
+def quantity_source(name, quantity):
+    # Source line of a quantity in the layout of the ruff formatter
+    arguments = [
+        f'type={type(quantity.type).__name__}()',
+        "shape=['*']",
+        f"unit='{quantity.unit}'",
+    ]
+    line = f'{INDENT}{name} = Quantity({", ".join(arguments)})\n'
+    if len(line) - 1 <= LINE_LENGTH:
+        return line
+    wrapped = f'{INDENT * 2}{", ".join(arguments)}\n'
+    if len(wrapped) - 1 <= LINE_LENGTH:
+        return f'{INDENT}{name} = Quantity(\n{wrapped}{INDENT})\n'
+    wrapped = ''.join(f'{INDENT * 2}{argument},\n' for argument in arguments)
+    return f'{INDENT}{name} = Quantity(\n{wrapped}{INDENT})\n'
+
+
+def generated_source():
+    return ''.join(
+        quantity_source(name, quantity)
+        for name, quantity in make_quantity_dict().items()
+    )
+
+
+def split_schema_source(schema_source):
+    # Split the schema module into the parts before, in and after the
+    # generated quantities
+    begin = schema_source.index(BEGIN_MARKER) + len(BEGIN_MARKER)
+    end = schema_source.index(END_MARKER)
+    return schema_source[:begin], schema_source[begin:end], schema_source[end:]
+
+
+def write_quantity_file(schema_file=SCHEMA_FILE):
+    with open(schema_file) as file:
+        head, _, tail = split_schema_source(file.read())
+    with open(schema_file, 'w') as file:
+        file.write(head + generated_source() + tail)
+
+
+if __name__ == '__main__':
+    write_quantity_file()
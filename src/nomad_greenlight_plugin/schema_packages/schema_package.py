@@ -10,23 +10,24 @@ if TYPE_CHECKING:
         BoundLogger,
     )
 
-import os
-
 import numpy as np
-import pandas as pd
-import pint
-
-# import plotly.express as px
-import plotly.graph_objects as go
 from nomad.config import config
-from nomad.datamodel.data import Schema
+from nomad.datamodel.data import ArchiveSection, Schema
+from nomad.datamodel.hdf5 import HDF5Reference, match_hdf5_reference
 from nomad.datamodel.metainfo.annotations import ELNAnnotation, ELNComponentEnum
 from nomad.datamodel.metainfo.plot import PlotlyFigure, PlotSection
-from nomad.metainfo import Quantity, SchemaPackage
+from nomad.metainfo import (
+    Datetime,
+    Quantity,
+    Reference,
+    SchemaPackage,
+    SectionProxy,
+    SubSection,
+)
 from nomad.metainfo.data_type import m_float64, m_str
-from plotly.subplots import make_subplots
 
-from nomad_greenlight_plugin import read_files as rf
+from nomad_greenlight_plugin import analysis, instrumentation
+from nomad_greenlight_plugin.decimation import min_max_pyramid
 
 configuration = config.get_plugin_entry_point(
     'nomad_greenlight_plugin.schema_packages:schema_package_entry_point'
@@ -34,102 +35,386 @@ configuration = config.get_plugin_entry_point(
 
 m_package = SchemaPackage()
 
+# Tags averaged for the polarization curve by their name in PolarizationCurve
+POLARIZATION_TAGS = {
+    'current': 'current',
+    'current_density': 'current_density',
+    'cell_voltage_mean': 'cell_voltage_mean',
+    'cell_voltage_total': 'cell_voltage_total',
+    'hfr': 'eis01_estimated_hfr',
+    'temp_coolant_inlet': 'temp_coolant_inlet',
+    'temp_coolant_outlet': 'temp_coolant_outlet',
+}
+# Tags of the impedance points by their name in ImpedanceSpectrum
+IMPEDANCE_TAGS = {
+    'real_z': 'eis01_real_z',
+    'imag_z': 'eis01_imag_z',
+    'modulus_z': 'eis01_modulus_z',
+    'phase_z': 'eis01_phase_z',
+    'stdev_z': 'eis01_stdev_z',
+    'timestamp_z': 'eis01_timestamp_z',
+    'dc_current': 'eis01_dc_current',
+}
+# Tags plotted by normalize
+PLOT_TAGS = ('cell_voltage_total', 'current')
+# Quantities of shape ['*'] which are not time series tags
+NON_TAG_QUANTITIES = ('part_files', 'packed_tags', 'packed_units')
 
-def decorator(cls):
-    cls.initialize_quantities()
-    return cls
-
-
-def convert_units(units: dict):
-    unit_conversion = {
-        'dimensionless': [
-            'N/A',
-            '<enum>',
-            '%',
-            'CYCLES',
-            'OFF/ON',
-            'POINTS',
-            'False/True',
-        ],
-        'liter/minute': ['NLPM'],
-        'deg': ['�'],
-        'degC': ['�C'],
-        'A/cm�': ['A/cm**2'],
-    }
-    # Reverse key-value-order in unit_conversion dict
-    uc_rev = {}
-    for key, value in unit_conversion.items():
-        for item in value:
-            uc_rev[item] = key
-    # Convert unit strings
-    for key, value in units.items():
-        if value in uc_rev:
-            units[key] = uc_rev[value]
-    return units
-
-
-def make_quantity_dict(create_objects=True):
-    # Initialize all data quantities from empty template csv file
-    empty_file_path = os.path.join(os.path.dirname(__file__), 'greenlight_empty.csv')
-    data_file_object = rf.read_single_file(empty_file_path)
-    columns = data_file_object.data.columns
-    units = convert_units(data_file_object.units)
-    df = data_file_object.data
-    type_dict = df.dtypes.to_dict()
-    for k, v in type_dict.items():
-        if isinstance(v, np.dtypes.ObjectDType):
-            type_dict[k] = str
-    quantities = {}
-    for col in columns:
-        if create_objects:
-            try:
-                quantities[col] = Quantity(
-                    type=type_dict[col], shape=['*'], unit=units[col]
-                )
-            except (pint.errors.UndefinedUnitError, ValueError, AttributeError):
-                quantities[col] = Quantity(
-                    type=type_dict[col], shape=['*'], unit='dimensionless'
-                )
-        else:
-            quantities[col] = (
-                f"Quantity(type={type_dict[col]}, shape=['*'], unit='{units[col]}')\n"
-            )
-    return quantities
-
-
-def write_quantity_file():
-    create_objects = True
-    quantities = make_quantity_dict(create_objects=create_objects)
-    quantity_file = os.path.join(os.path.dirname(__file__), 'quantities.py')
-    with open(quantity_file, 'w') as file:
-        if create_objects:
-            for key, value in quantities.items():
-                file.write(
-                    f"{key} = Quantity(type={value.type}, shape=['*'], "
-                    f"unit='{value.unit}')\n"
-                )
-        else:
-            for key, value in quantities.items():
-                file.write(f'{key} = {value})\n')
 
+class EncodedTag(ArchiveSection):
+    """
+    Numeric tag changing in only a few rows, stored as the row indices where
+    its value changes and the values from these rows on.
+    """
+
+    name = Quantity(type=str, description='Tag name')
+    unit = Quantity(type=str, description='Unit of the values')
+    change_indices = Quantity(
+        type=np.int64, shape=['*'], description='Rows starting a new value'
+    )
+    values = Quantity(type=np.float64, shape=['*'], description='Value of each run')
+
+    def expand(self, row_count):
+        # Full per-row array of the tag
+        run_lengths = np.diff(self.change_indices, append=row_count)
+        return np.repeat(self.values, run_lengths)
+
+
+class HDF5Tag(ArchiveSection):
+    """
+    Numeric tag offloaded to a chunked dataset of an HDF5 file in the upload.
+    """
+
+    name = Quantity(type=str, description='Tag name')
+    dataset = Quantity(
+        type=HDF5Reference,
+        description='Dataset of the tag as <upload path>#/tags/<tag name>',
+    )
+
+    def read(self, archive, start=None, stop=None):
+        # Only the chunks of the requested rows are read
+        from nomad_greenlight_plugin.hdf5_storage import open_raw_file, read_dataset
+
+        reference = match_hdf5_reference(self.dataset)
+        with open_raw_file(archive, reference['file_id']) as file:
+            return read_dataset(file, reference['path'], start, stop)
+
+
+class PlotLevel(ArchiveSection):
+    """
+    Level of the min/max decimation pyramid of a plotted tag.
+    """
+
+    tag = Quantity(type=str, description='Name of the plotted tag')
+    level = Quantity(
+        type=int,
+        description='Pyramid level from 1 on, level 0 is the full series of the tag',
+    )
+    rows = Quantity(
+        type=np.int64, shape=['*'], description='Rows of the values in the full series'
+    )
+    time = Quantity(type=np.float64, shape=['*'], unit='second')
+    values = Quantity(type=np.float32, shape=['*'], description='Decimated values')
+
+
+class SegmentStatistics(ArchiveSection):
+    """
+    Summary statistics of a tag over a file mark segment.
+    """
+
+    tag = Quantity(type=str, description='Tag name')
+    unit = Quantity(type=str, description='Unit of the statistics')
+    mean = Quantity(type=np.float64)
+    minimum = Quantity(type=np.float64)
+    maximum = Quantity(type=np.float64)
+    last = Quantity(type=np.float64, description='Last valid value of the segment')
 
-# write_quantity_file()
+
+class Segment(ArchiveSection):
+    """
+    Consecutive rows with the same file mark.
+    """
+
+    label = Quantity(type=str, description='File mark of the segment')
+    start_row = Quantity(type=int, description='First row of the segment')
+    end_row = Quantity(type=int, description='Row after the last row of the segment')
+    start_time = Quantity(type=np.float64, unit='second')
+    end_time = Quantity(type=np.float64, unit='second')
+    duration = Quantity(type=np.float64, unit='second')
+    statistics = SubSection(section_def=SegmentStatistics, repeats=True)
+
+
+class PolarizationCurve(ArchiveSection):
+    """
+    Steady state points of the current setpoint plateaus of the test. Each
+    value is the mean over a plateau after its settling time.
+    """
+
+    start_time = Quantity(
+        type=np.float64, shape=['*'], unit='second', description='Averaging start'
+    )
+    end_time = Quantity(
+        type=np.float64, shape=['*'], unit='second', description='Averaging end'
+    )
+    row_count = Quantity(
+        type=np.int64, shape=['*'], description='Number of averaged rows'
+    )
+    current = Quantity(type=np.float64, shape=['*'], unit='ampere')
+    current_density = Quantity(
+        type=np.float64, shape=['*'], unit='ampere / centimeter ** 2'
+    )
+    cell_voltage_mean = Quantity(type=np.float64, shape=['*'], unit='volt')
+    cell_voltage_total = Quantity(type=np.float64, shape=['*'], unit='volt')
+    hfr = Quantity(
+        type=np.float64,
+        shape=['*'],
+        unit='ohm',
+        description='High frequency resistance estimated by the EIS module',
+    )
+    temp_coolant_inlet = Quantity(type=np.float64, shape=['*'], unit='degree_Celsius')
+    temp_coolant_outlet = Quantity(type=np.float64, shape=['*'], unit='degree_Celsius')
+
+
+class ImpedanceSpectrum(PlotSection):
+    """
+    Impedance points of one EIS frequency sweep, values of Z as logged by the
+    EIS module.
+    """
+
+    start_time = Quantity(type=np.float64, unit='second')
+    end_time = Quantity(type=np.float64, unit='second')
+    dc_current = Quantity(
+        type=np.float64, unit='ampere', description='Mean DC current of the sweep'
+    )
+    time = Quantity(type=np.float64, shape=['*'], unit='second')
+    frequency = Quantity(type=np.float64, shape=['*'], unit='hertz')
+    real_z = Quantity(
+        type=np.float64, shape=['*'], unit='ohm', description='Real part of Z'
+    )
+    imag_z = Quantity(
+        type=np.float64, shape=['*'], unit='ohm', description='Imaginary part of Z'
+    )
+    modulus_z = Quantity(
+        type=np.float64, shape=['*'], unit='ohm', description='Modulus of Z'
+    )
+    phase_z = Quantity(type=np.float64, shape=['*'], unit='degree')
+    stdev_z = Quantity(
+        type=np.float64,
+        shape=['*'],
+        unit='ohm',
+        description='Standard deviation of Z',
+    )
+
+    def make_figure(self):
+        # Nyquist and Bode plot of the sweep
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+
+        frequency = self.frequency.magnitude
+        fig = make_subplots(
+            rows=1,
+            cols=2,
+            specs=[[{}, {'secondary_y': True}]],
+            subplot_titles=('Nyquist', 'Bode'),
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=self.real_z.magnitude,
+                y=-self.imag_z.magnitude,
+                mode='lines+markers',
+                name='Z',
+            ),
+            row=1,
+            col=1,
+        )
+        fig.add_trace(
+            go.Scatter(x=frequency, y=self.modulus_z.magnitude, name='|Z|'),
+            row=1,
+            col=2,
+        )
+        fig.add_trace(
+            go.Scatter(x=frequency, y=self.phase_z.magnitude, name='Phase / °'),
+            row=1,
+            col=2,
+            secondary_y=True,
+        )
+        fig.update_xaxes(title_text="Z' / Ω", row=1, col=1)
+        fig.update_yaxes(title_text="-Z'' / Ω", row=1, col=1)
+        fig.update_xaxes(title_text='Frequency / Hz', type='log', row=1, col=2)
+        fig.update_yaxes(title_text='|Z| / Ω', type='log', row=1, col=2)
+        fig.update_yaxes(title_text='Phase / °', row=1, col=2, secondary_y=True)
+        self.figures.append(
+            PlotlyFigure(label='Impedance spectrum', figure=fig.to_plotly_json())
+        )
+
+
+class VoltammetryCycle(ArchiveSection):
+    """
+    Cycle of a cyclic voltammetry run, from a reversal at apex 2 over a
+    reversal at apex 1 to the next reversal at apex 2.
+    """
+
+    run = Quantity(type=int, description='Number of the CV run of the test')
+    cycle = Quantity(type=int, description='Number of the cycle in its run')
+    start_time = Quantity(type=np.float64, unit='second')
+    end_time = Quantity(type=np.float64, unit='second')
+    scan_rate = Quantity(
+        type=np.float64, unit='volt / second', description='Scan rate setpoint'
+    )
+    anodic_charge = Quantity(
+        type=np.float64,
+        unit='coulomb',
+        description='Integral of the positive current over the cycle',
+    )
+    cathodic_charge = Quantity(
+        type=np.float64,
+        unit='coulomb',
+        description='Integral of the negative current over the cycle',
+    )
+    time = Quantity(type=np.float64, shape=['*'], unit='second')
+    voltage = Quantity(type=np.float64, shape=['*'], unit='volt')
+    current = Quantity(type=np.float64, shape=['*'], unit='ampere')
+
+
+class RunSummary(ArchiveSection):
+    """
+    Scalar summary of the whole test, indexed for searching entries without
+    loading their time series.
+    """
+
+    duration = Quantity(type=np.float64, unit='second', description='Test duration')
+    max_current = Quantity(type=np.float64, unit='ampere')
+    max_current_density = Quantity(type=np.float64, unit='ampere / centimeter ** 2')
+    max_power = Quantity(type=np.float64, unit='watt')
+    charge = Quantity(
+        type=np.float64,
+        unit='ampere * hour',
+        description='Integral of the current over the test',
+    )
+    ocv = Quantity(
+        type=np.float64,
+        unit='volt',
+        description='Median mean cell voltage at open circuit',
+    )
+    min_cell_voltage = Quantity(type=np.float64, unit='volt')
+    max_cell_voltage = Quantity(type=np.float64, unit='volt')
+    mean_stack_temperature = Quantity(
+        type=np.float64,
+        unit='degree_Celsius',
+        description='Mean of the coolant inlet and outlet temperatures',
+    )
+    active_area = Quantity(type=np.float64, unit='centimeter ** 2')
+    cell_count = Quantity(type=int)
+    segment_count = Quantity(type=int, description='Number of file mark segments')
+
+
+class ProcessingStage(ArchiveSection):
+    """
+    Resources used by a stage of the parser or normalizer run which produced
+    the entry.
+    """
+
+    component = Quantity(type=str, description='parser or normalizer')
+    name = Quantity(type=str, description='Stage name, nested stages joined by /')
+    calls = Quantity(type=int, description='Number of runs of the stage')
+    wall_time = Quantity(type=np.float64, unit='second')
+    cpu_time = Quantity(type=np.float64, unit='second')
+    max_rss = Quantity(
+        type=int, unit='byte', description='Maximum resident set size after the stage'
+    )
+    peak_memory = Quantity(
+        type=int,
+        unit='byte',
+        description='Peak of the traced memory above its value at the start',
+    )
 
 
-# @decorator
 class GreenlightSchemaPackage(PlotSection, Schema):
     name = Quantity(
         type=str, a_eln=ELNAnnotation(component=ELNComponentEnum.StringEditQuantity)
     )
     message = Quantity(type=str)
+    start_time = Quantity(
+        type=Datetime, description='Start time of the test, time is relative to it'
+    )
+    station_id = Quantity(type=str, description='Test station of the Emerald export')
+    part_number = Quantity(
+        type=int, description='Part number of a file in a multi-part series'
+    )
+    part_files = Quantity(
+        type=str,
+        shape=['*'],
+        description='Files of a multi-part series combined in this entry',
+    )
+    series_entry = Quantity(
+        type=Reference(SectionProxy('GreenlightSchemaPackage')),
+        description='Entry holding the combined data of a multi-part series',
+    )
+    packed_data = Quantity(
+        type=np.float64,
+        shape=['*', '*'],
+        description='Numeric time series of all tags in packed storage mode, '
+        'one column per tag in packed_tags',
+    )
+    packed_tags = Quantity(
+        type=str, shape=['*'], description='Tag names of the packed_data columns'
+    )
+    packed_units = Quantity(
+        type=str, shape=['*'], description='Units of the packed_data columns'
+    )
+    row_count = Quantity(type=int, description='Number of rows of the time series')
+    parsed_bytes = Quantity(
+        type=int, description='Size of the parsed part of the mainfile in bytes'
+    )
+    prefix_hash = Quantity(
+        type=str, description='SHA-256 hash of the parsed part of the mainfile'
+    )
+    hdf5_tags = SubSection(section_def=HDF5Tag, repeats=True)
+    encoded_tags = SubSection(
+        section_def=EncodedTag,
+        repeats=True,
+        description='Numeric tags stored as change indices and values',
+    )
+    segments = SubSection(
+        section_def=Segment,
+        repeats=True,
+        description='Segments of the time series with the same file mark',
+    )
+    polarization_curve = SubSection(
+        section_def=PolarizationCurve,
+        description='Polarization curve of the current setpoint plateaus',
+    )
+    impedance_spectra = SubSection(
+        section_def=ImpedanceSpectrum,
+        repeats=True,
+        description='Impedance spectra of the EIS sweeps',
+    )
+    voltammetry_cycles = SubSection(
+        section_def=VoltammetryCycle,
+        repeats=True,
+        description='Cycles of the cyclic voltammetry runs',
+    )
+    plot_levels = SubSection(
+        section_def=PlotLevel,
+        repeats=True,
+        description='Decimation pyramids of the plotted tags',
+    )
+    summary = SubSection(
+        section_def=RunSummary, description='Searchable scalar summary of the test'
+    )
+    processing_stages = SubSection(
+        section_def=ProcessingStage,
+        repeats=True,
+        description='Time and memory of the parser and normalizer stages',
+    )
 
+    # Time series quantities generated from greenlight_empty.csv by
+    # generate_quantities.py, do not edit by hand
     time_stamp = Quantity(type=m_str(), shape=['*'], unit='dimensionless')
     elapsed_time = Quantity(type=m_float64(), shape=['*'], unit='second')
     file_mark = Quantity(type=m_str(), shape=['*'], unit='dimensionless')
-    anode_inlet_rel_hum = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    anode_inlet_rel_hum_calc = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    anode_inlet_rel_hum = Quantity(type=m_float64(), shape=['*'], unit='percent')
+    anode_inlet_rel_hum_calc = Quantity(type=m_float64(), shape=['*'], unit='percent')
     anode_recipe_selector = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
@@ -138,12 +423,8 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     anode_total_reactant_set = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
-    cathode_inlet_rel_hum = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
-    cathode_inlet_rel_hum_calc = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    cathode_inlet_rel_hum = Quantity(type=m_float64(), shape=['*'], unit='percent')
+    cathode_inlet_rel_hum_calc = Quantity(type=m_float64(), shape=['*'], unit='percent')
     cathode_recipe_selector = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
@@ -152,7 +433,7 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     cathode_total_reactant_set = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
-    cell_active_area = Quantity(type=m_float64(), shape=['*'], unit='centimeter')
+    cell_active_area = Quantity(type=m_float64(), shape=['*'], unit='centimeter ** 2')
     cell_count_total = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     cell_voltage_001 = Quantity(type=m_float64(), shape=['*'], unit='volt')
     cell_voltage_max = Quantity(type=m_float64(), shape=['*'], unit='volt')
@@ -165,29 +446,17 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     cell_voltage_open_cct = Quantity(type=m_float64(), shape=['*'], unit='volt')
     cell_voltage_std = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     cell_voltage_total = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    concentration_anode_h2 = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
-    concentration_anode_h2_set = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
-    concentration_anode_n2 = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
-    concentration_anode_n2_set = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
-    concentration_cathode_air = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    concentration_anode_h2 = Quantity(type=m_float64(), shape=['*'], unit='percent')
+    concentration_anode_h2_set = Quantity(type=m_float64(), shape=['*'], unit='percent')
+    concentration_anode_n2 = Quantity(type=m_float64(), shape=['*'], unit='percent')
+    concentration_anode_n2_set = Quantity(type=m_float64(), shape=['*'], unit='percent')
+    concentration_cathode_air = Quantity(type=m_float64(), shape=['*'], unit='percent')
     concentration_cathode_air_set = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
-    concentration_cathode_n2 = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='percent'
     )
+    concentration_cathode_n2 = Quantity(type=m_float64(), shape=['*'], unit='percent')
     concentration_cathode_n2_set = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='percent'
     )
     const_not_a_number = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     current = Quantity(type=m_float64(), shape=['*'], unit='ampere')
@@ -196,7 +465,7 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     )
     current_direction = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     current_internal_set = Quantity(type=m_float64(), shape=['*'], unit='ampere')
-    current_match_ratio = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    current_match_ratio = Quantity(type=m_float64(), shape=['*'], unit='percent')
     current_ramping_enable_flag = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
@@ -252,24 +521,22 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     eis01_dc_voltage_max_set = Quantity(type=m_float64(), shape=['*'], unit='volt')
     eis01_dc_voltage_min_set = Quantity(type=m_float64(), shape=['*'], unit='volt')
     eis01_dc_voltage_set = Quantity(type=m_float64(), shape=['*'], unit='volt')
-    eis01_estimated_hfr = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    eis01_estimated_z_set = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    eis01_estimated_hfr = Quantity(type=m_float64(), shape=['*'], unit='ohm')
+    eis01_estimated_z_set = Quantity(type=m_float64(), shape=['*'], unit='ohm')
     eis01_final_frequency_set = Quantity(type=m_float64(), shape=['*'], unit='hertz')
     eis01_frequency = Quantity(type=m_float64(), shape=['*'], unit='hertz')
     eis01_ie_range = Quantity(type=m_float64(), shape=['*'], unit='volt')
-    eis01_imag_z = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    eis01_imag_z = Quantity(type=m_float64(), shape=['*'], unit='ohm')
     eis01_initial_frequency_set = Quantity(type=m_float64(), shape=['*'], unit='hertz')
     eis01_max_voltage_set = Quantity(type=m_float64(), shape=['*'], unit='volt')
     eis01_model_no = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    eis01_modulus_z = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    eis01_modulus_z = Quantity(type=m_float64(), shape=['*'], unit='ohm')
     eis01_op_mode_set = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     eis01_phase_z = Quantity(type=m_float64(), shape=['*'], unit='degree')
     eis01_points_per_decade_set = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
-    eis01_real_z = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    eis01_real_z = Quantity(type=m_float64(), shape=['*'], unit='ohm')
     eis01_repeat_time_set = Quantity(type=m_float64(), shape=['*'], unit='minute')
     eis01_sample_mode_set = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
@@ -280,7 +547,7 @@ class GreenlightSchemaPackage(PlotSection, Schema):
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     eis01_start = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    eis01_stdev_z = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    eis01_stdev_z = Quantity(type=m_float64(), shape=['*'], unit='ohm')
     eis01_timestamp_z = Quantity(type=m_float64(), shape=['*'], unit='second')
     eis01_total_time_set = Quantity(type=m_float64(), shape=['*'], unit='hour')
     flow_anode_h2_mfc_total = Quantity(
@@ -309,8 +576,8 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     )
     flow_control_alarm = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     flow_control_disable = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    flow_coolant = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    flow_coolant_set = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    flow_coolant = Quantity(type=m_float64(), shape=['*'], unit='liter / minute')
+    flow_coolant_set = Quantity(type=m_float64(), shape=['*'], unit='liter / minute')
     gas_purge_duration_estop = Quantity(type=m_float64(), shape=['*'], unit='second')
     gas_purge_duration_manual = Quantity(type=m_float64(), shape=['*'], unit='second')
     gas_purge_manual_request = Quantity(
@@ -324,26 +591,20 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     heater_anode_dewpoint_a_ssr = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
-    heater_anode_dewpoint_pwm = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    heater_anode_dewpoint_pwm = Quantity(type=m_float64(), shape=['*'], unit='percent')
     heater_anode_dewpoint_ssr = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
-    heater_anode_endplate_pwm = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    heater_anode_endplate_pwm = Quantity(type=m_float64(), shape=['*'], unit='percent')
     heater_anode_endplate_ssr = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
-    heater_anode_heattape_pwm = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    heater_anode_heattape_pwm = Quantity(type=m_float64(), shape=['*'], unit='percent')
     heater_anode_heattape_ssr = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     heater_anode_humid_outlet_heattape_pwm = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='percent'
     )
     heater_anode_humid_outlet_heattape_ssr = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
@@ -352,30 +613,30 @@ class GreenlightSchemaPackage(PlotSection, Schema):
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     heater_cathode_dewpoint_pwm = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='percent'
     )
     heater_cathode_dewpoint_ssr = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     heater_cathode_endplate_pwm = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='percent'
     )
     heater_cathode_endplate_ssr = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     heater_cathode_heattape_pwm = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='percent'
     )
     heater_cathode_heattape_ssr = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     heater_cathode_humid_outlet_heattape_pwm = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='percent'
     )
     heater_cathode_humid_outlet_heattape_ssr = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
-    heater_coolant_pwm = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    heater_coolant_pwm = Quantity(type=m_float64(), shape=['*'], unit='percent')
     heater_coolant_ssr = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     heaters_enable = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     heaters_overtemp_shutdown = Quantity(
@@ -401,11 +662,11 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     mode = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     mode_set = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     power = Quantity(type=m_float64(), shape=['*'], unit='watt')
-    power_match_ratio = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    power_match_ratio = Quantity(type=m_float64(), shape=['*'], unit='percent')
     power_range_max = Quantity(type=m_float64(), shape=['*'], unit='watt')
     power_range_min = Quantity(type=m_float64(), shape=['*'], unit='watt')
     power_set = Quantity(type=m_float64(), shape=['*'], unit='watt')
-    pressure_anode_bpc = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    pressure_anode_bpc = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
     pressure_anode_bpc_disable = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
@@ -418,9 +679,9 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     pressure_anode_in_out_diff = Quantity(
         type=m_float64(), shape=['*'], unit='kilopascal'
     )
-    pressure_anode_inlet = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    pressure_anode_inlet = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
     pressure_anode_inlet_absolute = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='kilopascal'
     )
     pressure_anode_inlet_error = Quantity(
         type=m_float64(), shape=['*'], unit='kilopascal'
@@ -431,25 +692,19 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     pressure_anode_lock_in_transition = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
-    pressure_anode_min_lock = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
-    pressure_anode_outlet = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
-    pressure_anode_set = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    pressure_cathode_bpc = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    pressure_anode_min_lock = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
+    pressure_anode_outlet = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
+    pressure_anode_set = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
+    pressure_cathode_bpc = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
     pressure_cathode_coolant_diff = Quantity(
         type=m_float64(), shape=['*'], unit='kilopascal'
     )
     pressure_cathode_in_out_diff = Quantity(
         type=m_float64(), shape=['*'], unit='kilopascal'
     )
-    pressure_cathode_inlet = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    pressure_cathode_inlet = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
     pressure_cathode_inlet_absolute = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='kilopascal'
     )
     pressure_cathode_inlet_error = Quantity(
         type=m_float64(), shape=['*'], unit='kilopascal'
@@ -461,21 +716,17 @@ class GreenlightSchemaPackage(PlotSection, Schema):
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     pressure_cathode_min_lock = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
-    pressure_cathode_outlet = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='kilopascal'
     )
-    pressure_cathode_set = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    pressure_coolant_bpc = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    pressure_cathode_outlet = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
+    pressure_cathode_set = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
+    pressure_coolant_bpc = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
     pressure_coolant_in_out_diff = Quantity(
         type=m_float64(), shape=['*'], unit='kilopascal'
     )
-    pressure_coolant_inlet = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    pressure_coolant_inlet = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
     pressure_coolant_inlet_absolute = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='kilopascal'
     )
     pressure_coolant_inlet_error = Quantity(
         type=m_float64(), shape=['*'], unit='kilopascal'
@@ -487,12 +738,10 @@ class GreenlightSchemaPackage(PlotSection, Schema):
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     pressure_coolant_min_lock = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
-    pressure_coolant_outlet = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='kilopascal'
     )
-    pressure_coolant_set = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    pressure_coolant_outlet = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
+    pressure_coolant_set = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
     pressure_lock_cathode = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
@@ -506,18 +755,16 @@ class GreenlightSchemaPackage(PlotSection, Schema):
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     pressure_lock_ramp_diff = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
-    pressure_lock_ramp_step = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    pressure_lock_ramp_step = Quantity(type=m_float64(), shape=['*'], unit='kilopascal')
     pressure_lock_set = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     pressure_lock_step_timeout = Quantity(
         type=m_float64(), shape=['*'], unit='millisecond'
     )
     pressure_nitrogen_supply = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='kilopascal'
     )
     pressure_stack_compression = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='kilopascal'
     )
     pressure_stack_compression_diff = Quantity(
         type=m_float64(), shape=['*'], unit='kilopascal'
@@ -541,10 +788,10 @@ class GreenlightSchemaPackage(PlotSection, Schema):
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     pump_coolant_on = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    rh_calc_anode_01 = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    rh_calc_anode_02 = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    rh_calc_cathode_01 = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    rh_calc_cathode_02 = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    rh_calc_anode_01 = Quantity(type=m_float64(), shape=['*'], unit='percent')
+    rh_calc_anode_02 = Quantity(type=m_float64(), shape=['*'], unit='percent')
+    rh_calc_cathode_01 = Quantity(type=m_float64(), shape=['*'], unit='percent')
+    rh_calc_cathode_02 = Quantity(type=m_float64(), shape=['*'], unit='percent')
     safeguard_flag_purging = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
@@ -568,10 +815,8 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     )
     scattergraph_sort = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     signal_in_e_stop = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    signal_in_h2_sensor = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    signal_in_h2_sensor_second = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    signal_in_h2_sensor = Quantity(type=m_float64(), shape=['*'], unit='percent')
+    signal_in_h2_sensor_second = Quantity(type=m_float64(), shape=['*'], unit='percent')
     signal_in_relay_fs_alarm = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
@@ -586,24 +831,22 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     )
     signal_out_e_stop = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     signal_out_echem_on = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
-    signal_out_flow_coolant_ip = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
-    )
+    signal_out_flow_coolant_ip = Quantity(type=m_float64(), shape=['*'], unit='percent')
     signal_out_light_green = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     signal_out_light_red = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     signal_out_pressure_anode_ip = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='kilopascal'
     )
     signal_out_pressure_cathode_ip = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='kilopascal'
     )
     signal_out_pressure_coolant_ip = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='kilopascal'
     )
     signal_out_pressure_stack_compression_ip = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='kilopascal'
     )
     signal_out_shutdown = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     signal_out_wd_hit = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
@@ -730,7 +973,7 @@ class GreenlightSchemaPackage(PlotSection, Schema):
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     valve_anode_dewpoint_hex_outlet_pwm = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='percent'
     )
     valve_anode_dry_bypass = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
@@ -758,7 +1001,7 @@ class GreenlightSchemaPackage(PlotSection, Schema):
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     valve_cathode_dewpoint_hex_outlet_pwm = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='percent'
     )
     valve_cathode_dry_bypass = Quantity(
         type=m_float64(), shape=['*'], unit='dimensionless'
@@ -785,7 +1028,7 @@ class GreenlightSchemaPackage(PlotSection, Schema):
         type=m_float64(), shape=['*'], unit='dimensionless'
     )
     valve_di_coolant_hex_out_pwm = Quantity(
-        type=m_float64(), shape=['*'], unit='dimensionless'
+        type=m_float64(), shape=['*'], unit='percent'
     )
     valve_h2_supply = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     variable_01 = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
@@ -820,65 +1063,394 @@ class GreenlightSchemaPackage(PlotSection, Schema):
     variable_30 = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     vlc_start_request = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
     voltage = Quantity(type=m_float64(), shape=['*'], unit='volt')
-    voltage_match_ratio = Quantity(type=m_float64(), shape=['*'], unit='dimensionless')
+    voltage_match_ratio = Quantity(type=m_float64(), shape=['*'], unit='percent')
     voltage_range_max = Quantity(type=m_float64(), shape=['*'], unit='volt')
     voltage_range_min = Quantity(type=m_float64(), shape=['*'], unit='volt')
     voltage_set = Quantity(type=m_float64(), shape=['*'], unit='volt')
     time = Quantity(type=m_float64(), shape=['*'], unit='second')
+    # End of generated quantities
+
+    def column(self, name, start=None, stop=None):
+        # Values of the rows start to stop of a time series tag in any storage
+        # mode, in the unit of the quantity
+        rows = slice(start, stop)
+        for hdf5_tag in self.hdf5_tags:
+            if hdf5_tag.name == name:
+                return hdf5_tag.read(self.m_root(), start, stop)
+        if self.packed_tags and name in self.packed_tags:
+            return self.packed_data[rows, self.packed_tags.index(name)]
+        for encoded_tag in self.encoded_tags:
+            if encoded_tag.name == name:
+                return encoded_tag.expand(self.row_count)[rows]
+        value = getattr(self, name)
+        if value is None:
+            return None
+        return getattr(value, 'magnitude', value)[rows]
 
-    # Initial intention was to dynamically create the attributes with the
-    # initialize_quantities classmethod, however since this classmethod can only
-    # be called by the decorator afterward, the attributes are not completely
-    # registered in the nomad system. Therefore, a manual attribute assignment
-    # is used
-    @classmethod
-    def initialize_quantities(cls):
-        quantities = make_quantity_dict()
-        # Dynamically assign dictionary entries as object attributes
-        for key, value in quantities.items():
-            setattr(cls, key, value)
-        setattr(cls, 'quantity_names', list(quantities.keys()))
+    def normalize_polarization_curve(self, time):
+        # Steady state points of the current setpoint plateaus and their plot
+        import plotly.graph_objects as go
+
+        setpoint = self.column('current_set')
+        if setpoint is None:
+            setpoint = self.column('current')
+        if setpoint is None:
+            return
+        values = {
+            name: self.float_column(tag, len(time))
+            for name, tag in POLARIZATION_TAGS.items()
+        }
+        points = analysis.polarization_curve(
+            time,
+            setpoint,
+            values,
+            min_duration=configuration.polarization_min_duration,
+            settling_fraction=configuration.polarization_settling_fraction,
+            tolerance=configuration.polarization_tolerance,
+        )
+        if len(points) == 0:
+            return
+        self.polarization_curve = PolarizationCurve(
+            **{name: points[name].to_numpy() for name in points.columns}
+        )
+        fig = go.Figure(
+            go.Scatter(
+                x=points['current_density'],
+                y=points['cell_voltage_mean'],
+                mode='markers',
+                name='Cell voltage / V',
+            )
+        )
+        fig.update_xaxes(title_text='Current density / A/cm²')
+        fig.update_yaxes(title_text='Cell voltage / V')
+        self.figures.append(
+            PlotlyFigure(label='Polarization curve', figure=fig.to_plotly_json())
+        )
+
+    def normalize_impedance_spectra(self, time):
+        # Impedance spectra of all EIS sweeps extracted in one pass
+        frequency = self.column('eis01_frequency')
+        if frequency is None:
+            return
+        values = {
+            name: self.float_column(tag, len(time))
+            for name, tag in IMPEDANCE_TAGS.items()
+        }
+        initial_frequency = self.column('eis01_initial_frequency_set')
+        final_frequency = self.column('eis01_final_frequency_set')
+        direction = None
+        if initial_frequency is not None and final_frequency is not None:
+            direction = np.sign(
+                np.asarray(final_frequency, dtype='float64')
+                - np.asarray(initial_frequency, dtype='float64')
+            )
+        points = analysis.impedance_sweeps(
+            time,
+            frequency,
+            values,
+            direction=direction,
+            min_points=configuration.eis_min_points,
+        )
+        self.impedance_spectra = []
+        for _, sweep in points.groupby('sweep'):
+            impedance_spectrum = ImpedanceSpectrum(
+                start_time=sweep['time'].iloc[0],
+                end_time=sweep['time'].iloc[-1],
+                dc_current=sweep['dc_current'].mean(),
+                time=sweep['time'].to_numpy(),
+                frequency=sweep['frequency'].to_numpy(),
+                **{
+                    name: sweep[name].to_numpy()
+                    for name in ('real_z', 'imag_z', 'modulus_z', 'phase_z', 'stdev_z')
+                },
+            )
+            impedance_spectrum.make_figure()
+            self.impedance_spectra.append(impedance_spectrum)
+
+    def normalize_voltammetry_cycles(self, time):
+        # Cycles of the CV runs with their charge integrals and plot
+        import plotly.graph_objects as go
+
+        runs = analysis.voltammetry_runs(
+            self.column('cv01_start'),
+            self.column('file_mark'),
+            configuration.cv_file_mark_pattern,
+        )
+        voltage = self.column('cell_voltage_total')
+        if len(runs[0]) == 0 or voltage is None:
+            return
+        voltage = np.asarray(voltage, dtype='float64')
+        current = self.float_column('current', len(time))
+        values = {
+            tag: self.float_column(tag, len(time))
+            for tag in (
+                'cv01_apex1_voltage_set',
+                'cv01_apex2_voltage_set',
+                'cv01_scan_rate_set',
+            )
+        }
+        cycles = analysis.voltammetry_cycles(
+            time,
+            voltage,
+            current,
+            runs,
+            apex1=values['cv01_apex1_voltage_set'],
+            apex2=values['cv01_apex2_voltage_set'],
+            tolerance=configuration.cv_apex_tolerance,
+        )
+        self.voltammetry_cycles = []
+        if len(cycles) == 0:
+            return
+        fig = go.Figure()
+        for cycle in cycles.itertuples(index=False):
+            rows = slice(cycle.start_row, cycle.end_row)
+            voltammetry_cycle = VoltammetryCycle(
+                run=cycle.run,
+                cycle=cycle.cycle,
+                start_time=cycle.start_time,
+                end_time=cycle.end_time,
+                scan_rate=analysis.run_mean(values['cv01_scan_rate_set'][rows], np.nan),
+                anodic_charge=cycle.anodic_charge,
+                cathodic_charge=cycle.cathodic_charge,
+                time=time[rows],
+                voltage=voltage[rows],
+                current=current[rows],
+            )
+            self.voltammetry_cycles.append(voltammetry_cycle)
+            # Cycle plots come from the compact cycle arrays
+            fig.add_trace(
+                go.Scatter(
+                    x=voltammetry_cycle.voltage.magnitude,
+                    y=voltammetry_cycle.current.magnitude,
+                    name=f'Run {cycle.run} cycle {cycle.cycle}',
+                )
+            )
+        fig.update_xaxes(title_text='Voltage / V')
+        fig.update_yaxes(title_text='Current / A')
+        self.figures.append(
+            PlotlyFigure(label='Cyclic voltammetry', figure=fig.to_plotly_json())
+        )
+
+    def float_column(self, name, length):
+        # Float values of a tag, NaN if the tag is not stored
+        values = self.column(name)
+        if values is None:
+            return np.full(length, np.nan)
+        return np.asarray(values, dtype='float64')
+
+    def normalize_summary(self, time):
+        # Scalar summary reduced from the tags in one pass, tags missing in
+        # the entry are left unset
+        summary = analysis.run_summary(
+            time,
+            {tag: self.float_column(tag, len(time)) for tag in analysis.SUMMARY_TAGS},
+            configuration.ocv_max_current_density,
+        )
+        if self.segments:
+            summary['segment_count'] = len(self.segments)
+        if np.isfinite(summary['cell_count']):
+            summary['cell_count'] = int(summary['cell_count'])
+        self.summary = RunSummary(
+            **{name: value for name, value in summary.items() if np.isfinite(value)}
+        )
+
+    def plot_level(self, tag, start=None, end=None, max_points=None):
+        # Time and values of the finest pyramid level of a plotted tag with
+        # at most max_points in the time window. The window is looked up in
+        # the stored levels, the raw rows are only read for windows fitting
+        # at full resolution.
+        if max_points is None:
+            max_points = configuration.plot_max_points
+        levels = sorted(
+            (plot_level for plot_level in self.plot_levels if plot_level.tag == tag),
+            key=lambda plot_level: plot_level.level,
+            reverse=True,
+        )
+        if not levels:
+            # Short series are not decimated
+            return self.raw_window(tag, start, end)
+        selected = None
+        for plot_level in levels:
+            level_time = plot_level.time.magnitude
+            level_low, level_high = self.time_window(level_time, start, end)
+            if selected is not None and level_high - level_low > max_points:
+                break
+            selected, low, high = plot_level, level_low, level_high
+        time = selected.time.magnitude
+        if (
+            selected is levels[-1]
+            and high - low <= max_points
+            and selected.rows is not None
+        ):
+            # The raw rows of the window lie between the neighbours of the
+            # window in level 1, the finest stored level
+            rows = selected.rows
+            raw_low = int(rows[low - 1]) + 1 if low > 0 else 0
+            raw_high = int(rows[high]) if high < len(rows) else int(rows[-1]) + 1
+            raw = self.raw_window(tag, start, end, raw_low, raw_high)
+            if raw is not None and len(raw[0]) <= max_points:
+                return raw
+        return time[low:high], selected.values[low:high]
+
+    def raw_window(self, tag, start, end, low=None, high=None):  # noqa: PLR0913
+        # Time and values of the full series in the time window, searched in
+        # the rows low to high
+        time = self.column('time', low, high)
+        if time is None:
+            return None
+        time = np.asarray(time, dtype='float64')
+        offset = low or 0
+        window_low, window_high = self.time_window(time, start, end)
+        values = self.column(tag, offset + window_low, offset + window_high)
+        if values is None:
+            return None
+        return time[window_low:window_high], np.asarray(values, dtype='float64')
+
+    @staticmethod
+    def time_window(time, start, end):
+        # Rows of the sorted time from start to end
+        low = 0 if start is None else np.searchsorted(time, start, side='left')
+        high = len(time) if end is None else np.searchsorted(time, end, 'right')
+        return low, high
+
+    def tag_names(self):
+        # Names of the time series tags holding data
+        stored_tags = set(self.packed_tags or [])
+        stored_tags.update(hdf5_tag.name for hdf5_tag in self.hdf5_tags)
+        stored_tags.update(encoded_tag.name for encoded_tag in self.encoded_tags)
+        return [
+            name
+            for name, quantity in self.m_def.all_quantities.items()
+            if quantity.shape == ['*']
+            and name not in NON_TAG_QUANTITIES
+            and (name in stored_tags or self.m_is_set(quantity))
+        ]
+
+    def store_processing_stages(self, timer):
+        # Stages of an earlier run of the same component are replaced
+        stages = [
+            ProcessingStage(**stage.m_to_dict())
+            for stage in self.processing_stages
+            if stage.component != timer.component
+        ]
+        stages.extend(
+            ProcessingStage(component=timer.component, **record)
+            for record in timer.records.values()
+        )
+        self.processing_stages = stages
 
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
         super().normalize(archive, logger)
         if logger is not None:
             logger.info('GreenlightSchema.normalize', parameter=configuration.parameter)
         archive.metadata.entry_name = self.name
+        if self.column('time') is None:
+            return
+        timer = instrumentation.StageTimer(
+            'normalizer', trace_memory=configuration.trace_memory
+        )
+        profile_path = None
+        if configuration.profiler is not None:
+            profile_path = instrumentation.profile_path(
+                configuration.profile_directory,
+                archive.metadata.mainfile or self.name or 'greenlight',
+                'normalizer',
+                configuration.profiler,
+            )
+        with timer.activate():
+            with instrumentation.profile(configuration.profiler, profile_path, logger):
+                self.normalize_time_series()
+        timer.log(logger)
+        if configuration.store_processing_metrics:
+            self.store_processing_stages(timer)
 
+    def normalize_time_series(self):
         # Make plot
+        # Pyramids of decimated levels, the figure shows the coarsest
+        time = np.asarray(self.column('time'), dtype='float64')
+        self.plot_levels = []
+        traces = {}
+        with instrumentation.stage('plot_levels'):
+            for tag in PLOT_TAGS:
+                values = self.column(tag)
+                if values is None:
+                    # Tag not selected by the parser
+                    continue
+                values = np.asarray(values, dtype='float64')
+                pyramid = min_max_pyramid(values, configuration.plot_max_points)
+                # The full series is level 0, it is already stored in the tag
+                for level, indices in enumerate(pyramid[1:], start=1):
+                    self.plot_levels.append(
+                        PlotLevel(
+                            tag=tag,
+                            level=level,
+                            rows=indices,
+                            time=time[indices],
+                            values=values[indices],
+                        )
+                    )
+                traces[tag] = time[pyramid[-1]], values[pyramid[-1]]
+        if traces:
+            with instrumentation.stage('figure'):
+                self.figures.append(self.overview_figure(traces))
+        with instrumentation.stage('summary'):
+            self.normalize_summary(time)
+        with instrumentation.stage('polarization_curve'):
+            self.normalize_polarization_curve(time)
+        with instrumentation.stage('impedance_spectra'):
+            self.normalize_impedance_spectra(time)
+        with instrumentation.stage('voltammetry_cycles'):
+            self.normalize_voltammetry_cycles(time)
+
+    def overview_figure(self, traces):
+        # Plotting libraries are only imported when needed
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+
         # Add figure
-        plot_df = pd.DataFrame(
-            dict(
-                time=self.time,
-                current=self.current,
-                voltage=self.cell_voltage_total,
-            )
-        )
         fig = make_subplots(specs=[[{'secondary_y': True}]])
-        # Add lines
-        fig.add_trace(
-            go.Scatter(
-                x=plot_df['time'],
-                y=plot_df['voltage'],
-                name='Voltage / V',
-            ),
-            secondary_y=False,
-        )
-        fig.add_trace(
-            go.Scatter(x=plot_df['time'], y=plot_df['current'], name='Current / A'),
-            secondary_y=True,
-        )
+        # Add lines of the stored tags
+        if 'cell_voltage_total' in traces:
+            fig.add_trace(
+                go.Scatter(
+                    x=traces['cell_voltage_total'][0],
+                    y=traces['cell_voltage_total'][1],
+                    name='Voltage / V',
+                ),
+                secondary_y=False,
+            )
+        if 'current' in traces:
+            fig.add_trace(
+                go.Scatter(
+                    x=traces['current'][0],
+                    y=traces['current'][1],
+                    name='Current / A',
+                ),
+                secondary_y=True,
+            )
         # Set x-axis title
         fig.update_xaxes(title_text='Time / s')
         # Set y-axes titles
         fig.update_yaxes(title_text='Voltage / V', secondary_y=False)
         fig.update_yaxes(title_text='Current / A', secondary_y=True)
-        plotly_figure = PlotlyFigure(figure=fig.to_plotly_json())
-        self.figures.append(plotly_figure)
+        return PlotlyFigure(figure=fig.to_plotly_json())
 
         # figure = px.line(plot_df, x='time', y='voltage')
         # self.figures.append(
         #     PlotlyFigure(figure).to_plotly_json())
 
 
+def quantity_column_types(section_cls=GreenlightSchemaPackage):
+    # Target dtypes of the time series columns for the reader
+    column_types = {}
+    for name, quantity in section_cls.m_def.all_quantities.items():
+        if quantity.shape != ['*'] or name in NON_TAG_QUANTITIES:
+            continue
+        if isinstance(quantity.type, m_str) or quantity.type is str:
+            column_types[name] = 'str'
+        elif isinstance(quantity.type, m_float64) or quantity.type is float:
+            column_types[name] = 'float64'
+    return column_types
+
+
 m_package.__init_metainfo__()
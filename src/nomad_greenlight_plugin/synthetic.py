@@ -0,0 +1,198 @@
+"""
+Generates synthetic Greenlight exports in the Emerald format, with the
+preamble and the full tag set of the empty Greenlight template. The current
+follows setpoint plateaus changing with the file mark segments, the cell
+voltage a simple polarization model and the other tags keep the values of the
+template row. Used by the tests and the benchmarks:
+
+    python -m nomad_greenlight_plugin.synthetic <directory> --rows 100000 --parts 4
+"""
+
+import argparse
+import os
+from datetime import datetime
+
+import numpy as np
+
+from nomad_greenlight_plugin import read_files as rf
+
+TEMPLATE_FILE = os.path.join(
+    os.path.dirname(__file__), 'schema_packages', 'greenlight_empty.csv'
+)
+TEST_NAME = 'synthetic-test'
+START_TIME = datetime(2023, 7, 15, 7, 47, 38)
+SEGMENT_LABELS = (
+    'characterization',
+    'polarization',
+    'constant current',
+    'eis',
+    'ocv',
+)
+# Current setpoints in A of the plateaus, one per segment
+CURRENT_STEPS = (0.0, 2.5, 5.0, 10.0, 15.0, 20.0, 12.5, 7.5, 1.0)
+CHUNK_ROWS = 10000
+
+
+def read_template(template_file=TEMPLATE_FILE):
+    # Preamble lines, column names and the values of the first data row
+    with open(template_file, 'rb') as file_handle:
+        _, _, _, tags, _ = rf.read_preamble(file_handle)
+        data_offset = file_handle.tell()
+        row = rf.split_row(file_handle.readline())
+        file_handle.seek(0)
+        preamble = file_handle.read(data_offset).decode().splitlines(keepends=True)
+    return preamble, [rf.column_name(tag) for tag in tags], row
+
+
+def write_preamble(file_handle, preamble, test_name, start_time):
+    fields = {
+        'Test Name': test_name,
+        'Start Time': start_time.strftime(rf.START_TIME_FORMAT),
+    }
+    for line in preamble:
+        key = line.split(',', 1)[0]
+        if key in fields:
+            _, _, rest = line.split(',', 2)
+            file_handle.write(f'{key},{fields[key]},{rest}'.encode())
+        else:
+            file_handle.write(line.encode())
+
+
+def line_format(columns, row, dynamic_columns):
+    # printf format of a data row, with the template values of all columns
+    # which are not generated
+    fields = []
+    for col, value in zip(columns, row):
+        if col in ('time_stamp', 'file_mark'):
+            fields.append('%s')
+        elif col == 'elapsed_time':
+            fields.append('%.3f')
+        elif col in dynamic_columns:
+            fields.append('%.6f')
+        else:
+            fields.append(value.replace('%', '%%'))
+    return ','.join(fields) + '\n'
+
+
+def synthetic_values(rows, rng, active_area, segment_rows):
+    # Values of the generated tags for the given row numbers
+    segments = rows // segment_rows
+    current_set = np.take(CURRENT_STEPS, segments % len(CURRENT_STEPS))
+    current = np.abs(current_set + rng.normal(0, 0.01, len(rows)))
+    current_density = current / active_area
+    cell_voltage = (
+        1.0
+        - 0.06 * np.log10(1 + 1000 * current_density)
+        - 0.1 * current_density
+        + rng.normal(0, 0.001, len(rows))
+    )
+    temp_coolant_inlet = 80.0 + rng.normal(0, 0.05, len(rows))
+    values = dict(
+        current_set=current_set,
+        current=current,
+        current_density=current_density,
+        cell_voltage_001=cell_voltage,
+        cell_voltage_mean=cell_voltage,
+        cell_voltage_min=cell_voltage,
+        cell_voltage_max=cell_voltage,
+        cell_voltage_total=cell_voltage,
+        power=cell_voltage * current,
+        temp_coolant_inlet=temp_coolant_inlet,
+        temp_coolant_outlet=temp_coolant_inlet + 2.0 * current_density,
+    )
+    return segments, values
+
+
+def write_greenlight_file(  # noqa: PLR0913
+    file_path,
+    rows,
+    *,
+    first_row=0,
+    test_name=TEST_NAME,
+    start_time=START_TIME,
+    interval=1.0,
+    segment_rows=1000,
+    seed=0,
+):
+    """
+    Writes a synthetic Greenlight file with the given number of data rows,
+    logged every interval seconds from first_row on. Like the test stations,
+    the file mark is only written on the first row of each segment of
+    segment_rows rows.
+    """
+    preamble, columns, row = read_template()
+    template = dict(zip(columns, row))
+    active_area = float(template['cell_active_area'])
+    rng = np.random.default_rng(seed + first_row)
+    _, sample = synthetic_values(np.arange(1), rng, active_area, 1)
+    dynamic_columns = [col for col in columns if col in sample]
+    row_format = line_format(columns, row, dynamic_columns)
+    start = np.datetime64(start_time, 'ms')
+    with open(file_path, 'wb') as file_handle:
+        write_preamble(file_handle, preamble, test_name, start_time)
+        for chunk_start in range(first_row, first_row + rows, CHUNK_ROWS):
+            chunk = np.arange(
+                chunk_start, min(chunk_start + CHUNK_ROWS, first_row + rows)
+            )
+            segments, values = synthetic_values(chunk, rng, active_area, segment_rows)
+            time_stamps = np.char.replace(
+                np.datetime_as_string(
+                    start + (chunk * interval * 1000).astype('timedelta64[ms]'),
+                    unit='ms',
+                ),
+                'T',
+                ' ',
+            )
+            file_marks = np.where(
+                chunk % segment_rows == 0,
+                np.take(SEGMENT_LABELS, segments % len(SEGMENT_LABELS)),
+                '',
+            )
+            fields = [
+                time_stamps.tolist(),
+                (chunk * interval).tolist(),
+                file_marks.tolist(),
+            ]
+            fields.extend(values[col].tolist() for col in dynamic_columns)
+            file_handle.write(
+                ''.join(row_format % line for line in zip(*fields)).encode()
+            )
+    return file_path
+
+
+def write_series(directory, rows, parts=1, *, name=None, **kwargs):
+    """
+    Writes a synthetic test of the given number of rows as a stand-alone file
+    or as a multi-part series and returns the paths of the files.
+    """
+    if name is None:
+        name = f'{TEST_NAME} - {START_TIME:%y%m%d %H%M%S}'
+    if parts == 1:
+        return [
+            write_greenlight_file(
+                os.path.join(directory, f'{name}.csv'), rows, **kwargs
+            )
+        ]
+    part_rows = -(-rows // parts)
+    file_paths = []
+    for part in range(parts):
+        first_row = part * part_rows
+        file_paths.append(
+            write_greenlight_file(
+                os.path.join(directory, f'{name} - part_{part}.csv'),
+                max(min(part_rows, rows - first_row), 0),
+                first_row=first_row,
+                **kwargs,
+            )
+        )
+    return file_paths
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    argument_parser.add_argument('directory')
+    argument_parser.add_argument('--rows', type=int, default=10000)
+    argument_parser.add_argument('--parts', type=int, default=1)
+    arguments = argument_parser.parse_args()
+    for file_path in write_series(arguments.directory, arguments.rows, arguments.parts):
+        print(file_path)
@@ -0,0 +1,77 @@
+"""
+Resolution of the unit strings of Greenlight exports to pint units. The units
+row holds instrument notation (flags like 'OFF/ON', gauge pressures,
+'NLPM') which pint does not know, and the degree and superscript characters
+of the Windows exports often arrive as replacement characters. Every unit
+string is resolved once per process and shared by the reader, the parser and
+the schema generator.
+"""
+
+from functools import cache
+
+from nomad.units import ureg
+
+REPLACEMENT_CHARACTER = '\ufffd'
+# Greenlight notation of units pint cannot parse or misreads, e.g. 'N/A' as
+# newton per ampere
+UNIT_ALIASES = {
+    '': 'dimensionless',
+    'N/A': 'dimensionless',
+    '<enum>': 'dimensionless',
+    'CYCLES': 'dimensionless',
+    'POINTS': 'dimensionless',
+    'PTS': 'dimensionless',
+    # Binary states, stored as 0 and 1
+    'OFF/ON': 'dimensionless',
+    'CLOSED/OPEN': 'dimensionless',
+    'False/True': 'dimensionless',
+    'FALSE/TRUE': 'dimensionless',
+    'Forbidden/Authorized': 'dimensionless',
+    '%': 'percent',
+    'LPM': 'liter / minute',
+    'NLPM': 'liter / minute',
+    'Ohms': 'ohm',
+    # Gauge and absolute pressures, pint has no separate units for them
+    'kPag': 'kilopascal',
+    'kPaa': 'kilopascal',
+    '°': 'degree',
+    '°C': 'degree_Celsius',
+    'cm²': 'centimeter ** 2',
+    'A/cm²': 'ampere / centimeter ** 2',
+    # Degree and superscript characters lost in decoding, the only units of
+    # the exports containing them are the ones above
+    REPLACEMENT_CHARACTER: 'degree',
+    f'{REPLACEMENT_CHARACTER}C': 'degree_Celsius',
+    f'cm{REPLACEMENT_CHARACTER}': 'centimeter ** 2',
+    f'A/cm{REPLACEMENT_CHARACTER}': 'ampere / centimeter ** 2',
+}
+
+
+@cache
+def resolve_unit(unit: str):
+    """
+    Returns the pint unit of a Greenlight unit string in the notation of the
+    schema quantities, e.g. 'degree_Celsius' for '°C', or None if the unit is
+    unknown.
+    """
+    unit = unit.strip()
+    try:
+        return str(ureg.Unit(UNIT_ALIASES.get(unit, unit)))
+    except Exception:
+        # pint raises a variety of errors for unparsable strings
+        return None
+
+
+def resolve_units(units):
+    """
+    Resolves a dict of Greenlight unit strings by column. Returns the pint
+    units of the known and the original strings of the unknown units.
+    """
+    resolved, unknown = {}, {}
+    for col, unit in units.items():
+        pint_unit = resolve_unit(unit)
+        if pint_unit is None:
+            unknown[col] = unit
+        else:
+            resolved[col] = pint_unit
+    return resolved, unknown
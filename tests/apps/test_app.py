@@ -2,4 +2,4 @@ def test_importing_app():
     # this will raise an exception if pydantic model validation fails for th app
     from nomad_greenlight_plugin.apps import app_entry_point
 
-    assert app_entry_point.app.label == 'NewApp'
+    assert app_entry_point.app.label == 'Greenlight tests'
@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def write_part_files(tmp_path):
+    # Split the test file into a multi-part series and return the first part
+    def write(n_parts):
+        with open(os.path.join('tests', 'data', 'test_greenlight.csv'), 'rb') as file:
+            lines = file.readlines()
+        preamble, rows = lines[:18], lines[18:]
+        part_size = -(-len(rows) // n_parts)
+        for part in range(n_parts):
+            file_path = os.path.join(tmp_path, f'test - part_{part}.csv')
+            with open(file_path, 'wb') as file:
+                file.writelines(
+                    preamble + rows[part * part_size : (part + 1) * part_size]
+                )
+        return os.path.join(tmp_path, 'test - part_0.csv')
+
+    return write
@@ -1,7 +1,12 @@
+import numpy as np
 from nomad.client import normalize_all
 from nomad.datamodel import EntryArchive, EntryMetadata
 from nomad.datamodel.metainfo.workflow import Workflow
 
+from nomad_greenlight_plugin.schema_packages.schema_package import (
+    GreenlightSchemaPackage,
+)
+
 
 def test_normalizer():
     entry_archive = EntryArchive(
@@ -10,3 +15,27 @@ def test_normalizer():
     normalize_all(entry_archive)
 
     assert entry_archive.workflow2.name == 'test'
+    eln = entry_archive.results.eln if entry_archive.results else None
+    assert eln is None or 'fuel cell test' not in (eln.methods or [])
+
+
+def test_normalize_results():
+    time = np.arange(600.0)
+    current = np.repeat([0.0, 15.0, 5.0], 200)
+    entry_archive = EntryArchive(metadata=EntryMetadata())
+    entry_archive.data = GreenlightSchemaPackage(
+        name='test',
+        station_id='G21-2370',
+        time=time,
+        current=current,
+        current_set=current,
+        cell_voltage_total=1 - current / 50,
+        cell_voltage_mean=1 - current / 50,
+    )
+    normalize_all(entry_archive)
+
+    assert entry_archive.data.summary.max_current.magnitude == 15.0  # noqa: PLR2004
+    eln = entry_archive.results.eln
+    assert 'test' in eln.names
+    assert eln.instruments == ['G21-2370']
+    assert eln.methods == ['fuel cell test', 'polarization curve']
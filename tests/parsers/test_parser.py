@@ -1,24 +1,186 @@
 import logging
 import os
+import shutil
 
-from nomad.datamodel import EntryArchive
+import numpy as np
+from nomad.datamodel import EntryArchive, EntryMetadata
 
+from nomad_greenlight_plugin import synthetic
+from nomad_greenlight_plugin.parsers import parser as parser_module
 from nomad_greenlight_plugin.parsers.parser import GreenlightParser
+from nomad_greenlight_plugin.schema_packages import schema_package as schema_module
 
 
-def test_parse_file():
-    # test_file = os.path.join(
-    #   'tests', 'data',
-    #   'maxcoat-80ti-ast_gts1_ast-mc - 230715 074738 - part_0.csv')
-    # test_file = os.path.abspath(os.path.join('tests', 'data',
-    #                                          'test_greenlight.csv'))
-    # test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
-    test_file = os.path.join(
-        'tests', 'data',
-        'maxcoat-80ti-ast_gts1_ast-mc - 230715 074738 - part_0.csv'
-    )
+def test_parse_file(tmp_path):
+    test_file = synthetic.write_series(
+        tmp_path, 2500, parts=3, name='maxcoat-80ti-ast_gts1_ast-mc - 230715 074738'
+    )[0]
+
+    parser = GreenlightParser()
+    archive = EntryArchive()
+    parser.parse(test_file, archive, None)
+    assert len(archive.data.time_stamp) == 2500  # noqa: PLR2004
+    assert len(archive.data.segments) == 3  # noqa: PLR2004
+    assert archive.data.station_id == 'G21-2370'
+
 
+def test_parse_series(write_part_files):
+    mainfile = write_part_files(3)
     parser = GreenlightParser()
     archive = EntryArchive()
-    parser.parse(test_file, archive, logging.getLogger())
-    assert hasattr(archive.data, 'time_stamp')
+    parser.parse(mainfile, archive, logging.getLogger())
+    assert len(archive.data.time) == 378  # noqa: PLR2004
+    assert archive.data.part_files == [f'test - part_{part}.csv' for part in range(3)]
+
+    part_archive = EntryArchive()
+    parser.parse(mainfile.replace('part_0', 'part_2'), part_archive, None)
+    assert part_archive.data.time is None
+    assert part_archive.data.part_number == 2  # noqa: PLR2004
+    assert part_archive.data.series_entry.m_proxy_value == (
+        '../upload/archive/mainfile/test - part_0.csv#/data'
+    )
+
+
+def test_parse_packed(monkeypatch):
+    test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
+    columns_archive = EntryArchive()
+    GreenlightParser().parse(test_file, columns_archive, None)
+
+    monkeypatch.setattr(parser_module.configuration, 'storage_mode', 'packed')
+    archive = EntryArchive()
+    GreenlightParser().parse(test_file, archive, None)
+    assert archive.data.packed_data.shape == (378, len(archive.data.packed_tags))
+    assert archive.data.cell_voltage_total is None
+    assert archive.data.tag_names() == columns_archive.data.tag_names()
+    for name in ['time', 'cell_voltage_total', 'time_stamp']:
+        assert list(archive.data.column(name)) == list(
+            columns_archive.data.column(name)
+        )
+
+    archive = EntryArchive.m_from_dict(archive.m_to_dict())
+    assert archive.data.column('current').tolist() == list(
+        columns_archive.data.column('current')
+    )
+
+
+def test_parse_run_length_encoded(monkeypatch):
+    test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
+    columns_archive = EntryArchive()
+    GreenlightParser().parse(test_file, columns_archive, None)
+
+    monkeypatch.setattr(parser_module.configuration, 'run_length_encoding', True)
+    archive = EntryArchive()
+    GreenlightParser().parse(test_file, archive, None)
+    encoded_tags = [encoded_tag.name for encoded_tag in archive.data.encoded_tags]
+    assert 'cell_active_area' in encoded_tags
+    assert 'cell_voltage_total' not in encoded_tags
+    assert archive.data.cell_active_area is None
+    assert archive.data.tag_names() == columns_archive.data.tag_names()
+
+    archive = EntryArchive.m_from_dict(archive.m_to_dict())
+    for name in encoded_tags:
+        np.testing.assert_array_equal(
+            archive.data.column(name), columns_archive.data.column(name)
+        )
+
+
+def test_parse_hdf5(monkeypatch, tmp_path):
+    test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
+    columns_archive = EntryArchive()
+    GreenlightParser().parse(test_file, columns_archive, None)
+
+    mainfile = os.path.join(tmp_path, 'test_greenlight.csv')
+    shutil.copy(test_file, mainfile)
+    monkeypatch.setattr(parser_module.configuration, 'storage_mode', 'hdf5')
+    archive = EntryArchive()
+    GreenlightParser().parse(mainfile, archive, None)
+    hdf5_file = os.path.join(tmp_path, 'test_greenlight.csv.h5')
+    assert os.path.isfile(hdf5_file)
+    hdf5_tag = archive.data.hdf5_tags[0]
+    assert hdf5_tag.dataset == f'{hdf5_file}#/tags/{hdf5_tag.name}'
+    assert archive.data.cell_voltage_total is None
+    assert archive.data.tag_names() == columns_archive.data.tag_names()
+
+    archive = EntryArchive.m_from_dict(archive.m_to_dict())
+    np.testing.assert_array_equal(
+        archive.data.column('current', 100, 200),
+        columns_archive.data.column('current', 100, 200),
+    )
+    assert archive.data.column('time_stamp', 0, 1) == ['2023-07-15 07:47:39.005']
+
+
+def test_parse_segments(capsys):
+    test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
+    archive = EntryArchive()
+    GreenlightParser().parse(test_file, archive, None)
+    # Nothing is written to stdout of the NOMAD worker
+    assert capsys.readouterr().out == ''
+    segment = archive.data.segments[1]
+    assert segment.label == 'ocv_01'
+    assert (segment.start_row, segment.end_row) == (12, 20)
+    statistics = {item.tag: item for item in segment.statistics}
+    assert statistics['cell_voltage_total'].maximum == max(
+        archive.data.column('cell_voltage_total', 12, 20)
+    )
+
+
+def test_parse_without_file_marks(tmp_path):
+    # Files without any file mark have no segments
+    with open(os.path.join('tests', 'data', 'test_greenlight.csv'), 'rb') as file:
+        lines = file.read().split(b'\n')
+    data_start = next(
+        i for i, line in enumerate(lines) if line.startswith(b'Time Stamp,')
+    )
+    for i in range(data_start + 1, len(lines)):
+        fields = lines[i].split(b',')
+        if len(fields) > 2:  # noqa: PLR2004
+            fields[2] = b''
+            lines[i] = b','.join(fields)
+    test_file = tmp_path / 'test_greenlight.csv'
+    test_file.write_bytes(b'\n'.join(lines))
+    archive = EntryArchive()
+    GreenlightParser().parse(str(test_file), archive, None)
+    assert len(archive.data.cell_voltage_total) == 378  # noqa: PLR2004
+    assert len(archive.data.segments) == 0
+    assert set(archive.data.file_mark) == {''}
+
+
+def test_parse_tag_selection(monkeypatch):
+    test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
+    monkeypatch.setattr(
+        parser_module.configuration, 'exclude_tags', ['scratch', 'valve_*']
+    )
+    archive = EntryArchive()
+    GreenlightParser().parse(test_file, archive, None)
+    assert archive.data.variable_01 is None
+    assert archive.data.valve_h2_supply is None
+    assert len(archive.data.cell_voltage_total) == 378  # noqa: PLR2004
+
+
+def test_normalize_tag_selection(monkeypatch):
+    # Plotted tags which are not selected are skipped by the normalization
+    test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
+    monkeypatch.setattr(
+        parser_module.configuration, 'include_tags', ['cell_voltage_*', 'temp_*']
+    )
+    # Few enough points for the short test file to have decimated levels
+    monkeypatch.setattr(schema_module.configuration, 'plot_max_points', 50)
+    archive = EntryArchive(metadata=EntryMetadata())
+    GreenlightParser().parse(test_file, archive, None)
+    archive.data.normalize(archive, None)
+    assert archive.data.current is None
+    assert {plot_level.tag for plot_level in archive.data.plot_levels} == {
+        'cell_voltage_total'
+    }
+    assert archive.data.summary.max_current is None
+
+
+def test_parse_hdf5_series_twice(monkeypatch, tmp_path):
+    # The HDF5 file of a series is not taken for a part when parsing again
+    test_file = synthetic.write_series(tmp_path, 300, parts=3)[0]
+    monkeypatch.setattr(parser_module.configuration, 'storage_mode', 'hdf5')
+    for _ in range(2):
+        archive = EntryArchive()
+        GreenlightParser().parse(test_file, archive, None)
+        assert len(archive.data.part_files) == 3  # noqa: PLR2004
+        assert archive.data.row_count == 300  # noqa: PLR2004
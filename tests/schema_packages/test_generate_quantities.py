@@ -0,0 +1,9 @@
+from nomad_greenlight_plugin.schema_packages import generate_quantities as gq
+
+
+def test_generated_quantities():
+    # Fails if the schema was not regenerated after changing the template or
+    # the reader, run generate_quantities.py to update it
+    with open(gq.SCHEMA_FILE) as file:
+        _, source, _ = gq.split_schema_source(file.read())
+    assert source == gq.generated_source()
@@ -1,26 +1,14 @@
-import os.path
-
 from nomad.client import parse
 from nomad.units import ureg
 
+from nomad_greenlight_plugin import synthetic
+
 
-def test_schema_package():
-    # test_file = os.path.join(
-    #   'tests', 'data',
-    #   'maxcoat-80ti-ast_gts1_ast-mc - 230715 074738 - part_0.csv')
-    # test_file = os.path.abspath(
-    #     os.path.join('..', '..', 'tests', 'data', 'test_greenlight.csv')
-    # )
-    # test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
-    test_file = os.path.join(
-        'tests', 'data',
-        'maxcoat-80ti-ast_gts1_ast-mc - 230715 074738 - part_0.csv'
-    )
+def test_schema_package(tmp_path):
+    test_file = synthetic.write_series(
+        tmp_path, 2500, name='maxcoat-80ti-ast_gts1_ast-mc - 230715 074738'
+    )[0]
 
     entry_archive = parse(test_file)[0]
-    # normalize_all(entry_archive)
     entry_archive.data.normalize(entry_archive, None)
     assert entry_archive.data.current_density.units == ureg.Unit('A / cm^2')
-
-
-test_schema_package()
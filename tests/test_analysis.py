@@ -0,0 +1,279 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from nomad.datamodel import EntryArchive, EntryMetadata
+
+from nomad_greenlight_plugin import analysis
+from nomad_greenlight_plugin import read_files as rf
+from nomad_greenlight_plugin.schema_packages.schema_package import (
+    GreenlightSchemaPackage,
+)
+
+test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
+
+
+def test_segment_index():
+    file_marks = [np.nan, np.nan, 'ocv', 'ocv', 'load', 'ocv', np.nan, 'load']
+    starts, ends, labels = analysis.segment_index(file_marks)
+    assert starts.tolist() == [2, 4, 5, 7]
+    assert ends.tolist() == [4, 5, 6, 8]
+    assert labels == ['ocv', 'load', 'ocv', 'load']
+
+
+def test_segment_statistics():
+    data = rf.read_single_file(test_file).data
+    segments, statistics = analysis.segment_statistics(data)
+    assert segments['label'].tolist() == [
+        'characterization',
+        'ocv_01',
+        '600mv_01',
+        '300mv_01',
+        'polcurve_jmax_01',
+        'polcurve_dec_01',
+        'eis_25a-op_01',
+    ]
+    assert segments['end_row'].iloc[-1] == len(data)
+    for segment in segments.itertuples():
+        voltage = data['cell_voltage_total'].iloc[segment.start_row : segment.end_row]
+        voltage_statistics = statistics.loc[segment.Index, 'cell_voltage_total']
+        assert voltage_statistics['max'] == voltage.max()
+        assert voltage_statistics['last'] == voltage.iloc[-1]
+    assert segments['duration'].iloc[2] == 1803  # noqa: PLR2004
+
+
+def test_segment_statistics_empty():
+    data = pd.DataFrame(dict(time=[], file_mark=[], current=[]))
+    segments, statistics = analysis.segment_statistics(data)
+    assert len(segments) == 0
+    assert len(statistics) == 0
+
+
+def test_segment_statistics_without_file_marks():
+    # Rows without any file mark agree with the chunked accumulator
+    data = pd.DataFrame(
+        dict(time=np.arange(4.0), file_mark=[np.nan] * 4, current=np.arange(4.0))
+    )
+    segments, statistics = analysis.segment_statistics(data)
+    accumulator = analysis.SegmentAccumulator()
+    accumulator.update(data)
+    chunked_segments, chunked_statistics = accumulator.result(data['time'])
+    assert len(segments) == len(chunked_segments) == 0
+    assert len(statistics) == len(chunked_statistics) == 0
+
+
+def test_polarization_curve():
+    # Three load steps of 100 s with a settling transient in the voltage
+    time = np.arange(300.0)
+    setpoint = np.repeat([20.0, 10.0, 0.0], 100)
+    voltage = np.repeat([0.6, 0.7, 0.95], 100)
+    voltage[[0, 100, 200]] = 0.0
+    voltage[250] = np.nan
+    points = analysis.polarization_curve(
+        time,
+        setpoint,
+        dict(current=setpoint, voltage=voltage),
+        min_duration=30,
+        settling_fraction=0.5,
+        tolerance=0.005,
+    )
+    assert points['current'].tolist() == [20.0, 10.0, 0.0]
+    np.testing.assert_allclose(points['voltage'], [0.6, 0.7, 0.95])
+    assert points['row_count'].tolist() == [50, 50, 50]
+    assert points['start_time'].tolist() == [49.5, 149.5, 249.5]
+
+
+def test_normalize_polarization_curve():
+    time = np.arange(600.0)
+    current = np.repeat([25.0, 15.0, 5.0], 200)
+    archive = EntryArchive(metadata=EntryMetadata())
+    archive.data = GreenlightSchemaPackage(
+        time=time,
+        current=current,
+        current_set=current,
+        current_density=current / 25,
+        cell_voltage_total=1 - current / 50,
+        cell_voltage_mean=1 - current / 50,
+    )
+    archive.data.normalize(archive, None)
+    polarization_curve = archive.data.polarization_curve
+    np.testing.assert_allclose(
+        polarization_curve.current_density.magnitude, [1.0, 0.6, 0.2]
+    )
+    assert np.isnan(polarization_curve.hfr.magnitude).all()
+    assert str(polarization_curve.hfr.units) == 'ohm'
+    assert archive.data.figures[-1].label == 'Polarization curve'
+
+
+def eis_rows(n_sweeps=2, rows_per_point=3):
+    # Rows of EIS sweeps from 10 kHz to 1 Hz, each point repeated over
+    # several rows as logged
+    frequency = np.logspace(4, 0, 9)
+    z = 0.1 + 0.5 / (1 + 1j * frequency / 100)
+    frequency = np.tile(np.repeat(frequency, rows_per_point), n_sweeps)
+    z = np.tile(np.repeat(z, rows_per_point), n_sweeps)
+    return np.arange(len(frequency), dtype='float64'), frequency, z
+
+
+def test_impedance_sweeps():
+    time, frequency, z = eis_rows()
+    values = dict(real_z=z.real, imag_z=z.imag)
+    points = analysis.impedance_sweeps(time, frequency, values)
+    assert points['sweep'].tolist() == [0] * 9 + [1] * 9
+    assert points['time'].tolist()[:3] == [0, 3, 6]
+    np.testing.assert_allclose(points['real_z'][:9], z.real[::3][:9])
+    # Sweeps from low to high frequencies
+    points = analysis.impedance_sweeps(
+        time[::-1], frequency[::-1], values, direction=np.ones(len(time))
+    )
+    assert points['sweep'].nunique() == 2  # noqa: PLR2004
+    # Short sweeps are dropped
+    points = analysis.impedance_sweeps(time, frequency, values, min_points=10)
+    assert len(points) == 0
+
+
+def test_impedance_sweeps_without_points():
+    time, frequency, z = eis_rows()
+    points = analysis.impedance_sweeps(
+        time, np.zeros(len(time)), dict(real_z=z.real, imag_z=z.imag)
+    )
+    assert len(points) == 0
+    assert list(points.columns) == ['time', 'frequency', 'sweep', 'real_z', 'imag_z']
+
+    data_file_object = rf.read_single_file(test_file)
+    data = data_file_object.data
+    archive = EntryArchive(metadata=EntryMetadata())
+    archive.data = GreenlightSchemaPackage(
+        time=data['time'],
+        current=data['current'],
+        cell_voltage_total=data['cell_voltage_total'],
+        eis01_frequency=np.zeros(len(data)),
+        eis01_real_z=data['eis01_real_z'],
+    )
+    archive.data.normalize(archive, None)
+    assert archive.data.impedance_spectra == []
+
+
+def test_normalize_impedance_spectra():
+    time, frequency, z = eis_rows(n_sweeps=3)
+    archive = EntryArchive(metadata=EntryMetadata())
+    archive.data = GreenlightSchemaPackage(
+        time=time,
+        current=np.zeros(len(time)),
+        cell_voltage_total=np.zeros(len(time)),
+        eis01_frequency=frequency,
+        eis01_real_z=z.real,
+        eis01_imag_z=z.imag,
+        eis01_modulus_z=np.abs(z),
+        eis01_phase_z=np.degrees(np.angle(z)),
+    )
+    archive.data.normalize(archive, None)
+    spectra = archive.data.impedance_spectra
+    assert len(spectra) == 3  # noqa: PLR2004
+    assert spectra[1].start_time.magnitude == 27  # noqa: PLR2004
+    np.testing.assert_allclose(spectra[2].modulus_z.magnitude, np.abs(z[::3][:9]))
+    assert str(spectra[2].real_z.units) == 'ohm'
+    assert spectra[0].figures[0].label == 'Impedance spectrum'
+
+
+def cv_rows(n_cycles=3):
+    # Triangular scans between 0.05 V and 1 V framed by holds at 0.4 V
+    scan = np.concatenate(
+        (np.linspace(0.05, 1.0, 96)[:-1], np.linspace(1.0, 0.05, 96)[:-1])
+    )
+    noise = np.random.default_rng(0).normal(0, 1e-4, len(scan) * n_cycles)
+    voltage = np.concatenate(
+        (np.full(10, 0.4), np.tile(scan, n_cycles) + noise, np.full(10, 0.4))
+    )
+    current = np.sign(np.gradient(voltage)) * 0.01
+    start_flags = np.zeros(len(voltage))
+    start_flags[10:-10] = 1
+    return np.arange(len(voltage), dtype='float64'), voltage, current, start_flags
+
+
+def test_voltammetry_cycles():
+    time, voltage, current, start_flags = cv_rows()
+    runs = analysis.voltammetry_runs(start_flags, None, '(?<![a-z])cv')
+    assert runs[0].tolist() == [10]
+    cycles = analysis.voltammetry_cycles(
+        time,
+        voltage,
+        current,
+        runs,
+        apex1=np.full(len(time), 1.0),
+        apex2=np.full(len(time), np.nan),
+        tolerance=0.05,
+    )
+    assert cycles['cycle'].tolist() == [0, 1, 2]
+    assert cycles['start_row'].tolist() == [10, 200, 390]
+    np.testing.assert_allclose(cycles['anodic_charge'], 0.95, atol=0.02)
+    np.testing.assert_allclose(cycles['cathodic_charge'], -0.95, atol=0.02)
+
+
+def test_voltammetry_runs_from_file_marks():
+    file_marks = ['ocv_01', 'CV_01', 'CV_01', np.nan, 'ocv_02', 'cv_02']
+    starts, ends = analysis.voltammetry_runs(np.zeros(6), file_marks, '(?<![a-z])cv')
+    assert starts.tolist() == [1, 5]
+    assert ends.tolist() == [3, 6]
+
+
+def test_normalize_voltammetry_cycles():
+    time, voltage, current, start_flags = cv_rows(n_cycles=2)
+    archive = EntryArchive(metadata=EntryMetadata())
+    archive.data = GreenlightSchemaPackage(
+        time=time,
+        current=current,
+        cell_voltage_total=voltage,
+        cv01_start=start_flags,
+        cv01_scan_rate_set=np.full(len(time), 0.05),
+    )
+    archive.data.normalize(archive, None)
+    cycles = archive.data.voltammetry_cycles
+    assert [cycle.cycle for cycle in cycles] == [0, 1]
+    assert cycles[1].scan_rate.magnitude == pytest.approx(0.05)
+    assert len(cycles[1].voltage) == 190  # noqa: PLR2004
+    assert archive.data.figures[-1].label == 'Cyclic voltammetry'
+
+
+def test_run_summary():
+    # One hour at open circuit, then one hour at 20 A
+    time = np.arange(0.0, 7201.0, 1.0)
+    open_circuit = time < 3600  # noqa: PLR2004
+    current = np.where(open_circuit, 0.0, 20.0)
+    values = {tag: np.full(len(time), np.nan) for tag in analysis.SUMMARY_TAGS}
+    values.update(
+        current=current,
+        current_density=current / 25,
+        cell_voltage_mean=np.where(open_circuit, 0.95, 0.6),
+        temp_coolant_inlet=np.full(len(time), 79.0),
+        temp_coolant_outlet=np.full(len(time), 81.0),
+        cell_active_area=np.full(len(time), 25.0),
+    )
+    summary = analysis.run_summary(time, values, 0.005)
+    assert summary['duration'] == 7200.0  # noqa: PLR2004
+    assert summary['ocv'] == 0.95  # noqa: PLR2004
+    assert summary['max_current_density'] == 0.8  # noqa: PLR2004
+    assert summary['mean_stack_temperature'] == 80.0  # noqa: PLR2004
+    assert summary['active_area'] == 25.0  # noqa: PLR2004
+    np.testing.assert_allclose(summary['charge'], 20.0, atol=0.01)
+    assert np.isnan(summary['min_cell_voltage'])
+
+
+def test_normalize_summary():
+    time = np.arange(600.0)
+    current = np.repeat([0.0, 15.0, 5.0], 200)
+    archive = EntryArchive(metadata=EntryMetadata())
+    archive.data = GreenlightSchemaPackage(
+        time=time,
+        current=current,
+        current_density=current / 25,
+        cell_voltage_total=1 - current / 50,
+        cell_voltage_mean=1 - current / 50,
+    )
+    archive.data.normalize(archive, None)
+    summary = archive.data.summary
+    assert summary.duration.magnitude == 599.0  # noqa: PLR2004
+    assert summary.ocv.magnitude == 1.0
+    assert summary.max_current.magnitude == 15.0  # noqa: PLR2004
+    assert summary.min_cell_voltage is None
@@ -0,0 +1,91 @@
+import numpy as np
+from nomad.datamodel import EntryArchive, EntryMetadata
+
+from nomad_greenlight_plugin.decimation import min_max_indices, min_max_pyramid
+from nomad_greenlight_plugin.schema_packages.schema_package import (
+    GreenlightSchemaPackage,
+)
+
+
+def test_min_max_indices():
+    values = np.sin(np.linspace(0, 20, 100_000))
+    # Load step and short dip, which have to survive the decimation
+    values[40_000:] += 1
+    dip = 70_000
+    values[dip] = -5
+    values[80_000:80_010] = np.nan
+    indices = min_max_indices(values, 1000)
+    assert len(indices) <= 1002  # noqa: PLR2004
+    assert np.all(np.diff(indices) > 0)
+    assert indices[0] == 0
+    assert indices[-1] == len(values) - 1
+    assert dip in indices
+    assert values[indices].max() == np.nanmax(values)
+    assert not np.isnan(values[indices]).any()
+    assert np.abs(np.diff(values[indices])).max() > 1
+
+
+def test_min_max_indices_short():
+    assert min_max_indices([1.0, 2.0, 3.0], 1000).tolist() == [0, 1, 2]
+
+
+def test_min_max_pyramid():
+    values = np.random.default_rng(0).normal(size=100_000)
+    levels = min_max_pyramid(values, 1000)
+    assert levels[0].tolist() == list(range(len(values)))
+    assert len(levels[-1]) <= 1002  # noqa: PLR2004
+    for finer, coarser in zip(levels, levels[1:]):
+        assert len(coarser) < len(finer)
+        assert np.isin(coarser, finer).all()
+        assert values[coarser].max() == values.max()
+
+
+def test_plot_level():
+    time = np.arange(100_000) * 0.1
+    archive = EntryArchive(metadata=EntryMetadata())
+    archive.data = GreenlightSchemaPackage(
+        time=time,
+        cell_voltage_total=np.sin(time),
+        current=np.where(time > 5000, 10.0, 0.0),  # noqa: PLR2004
+    )
+    archive.data.normalize(archive, None)
+    figure_data = archive.data.figures[0].figure['data']
+    # The full series is not copied into the pyramid
+    assert min(plot_level.level for plot_level in archive.data.plot_levels) == 1
+    assert len(figure_data[0]['x']) <= 2002  # noqa: PLR2004
+    column = archive.data.column
+    read_rows = []
+
+    def spy_column(name, start=None, stop=None):
+        read_rows.append((name, start, stop))
+        return column(name, start, stop)
+
+    archive.data.column = spy_column
+    time, values = archive.data.plot_level('current', 4990, 5010)
+    # A 20 s window is served at full resolution, only its rows are read
+    assert len(time) == 201  # noqa: PLR2004
+    assert values.max() == 10  # noqa: PLR2004
+    assert all(stop - start < 1000 for _, start, stop in read_rows)  # noqa: PLR2004
+    read_rows.clear()
+    # Wider windows are served from the finest level fitting into max_points
+    time, values = archive.data.plot_level('current', 1000, 6000, max_points=1000)
+    assert 0 < len(time) <= 1000  # noqa: PLR2004
+    assert time[0] >= 1000 and time[-1] <= 6000  # noqa: PLR2004
+    assert values.max() == 10  # noqa: PLR2004
+    assert read_rows == []
+    # Without a window the coarsest level, which is the plotted one
+    time, values = archive.data.plot_level('current')
+    assert time.tolist() == figure_data[1]['x']
+
+
+def test_plot_level_short_series():
+    time = np.arange(100.0)
+    archive = EntryArchive(metadata=EntryMetadata())
+    archive.data = GreenlightSchemaPackage(
+        time=time, cell_voltage_total=np.ones(100), current=np.zeros(100)
+    )
+    archive.data.normalize(archive, None)
+    assert archive.data.plot_levels == []
+    time, values = archive.data.plot_level('current', 10, 19)
+    assert time.tolist() == list(range(10, 20))
+    assert archive.data.plot_level('power') is None
@@ -0,0 +1,56 @@
+import os
+
+import pandas as pd
+
+from nomad_greenlight_plugin import read_files as rf
+from nomad_greenlight_plugin.frame_cache import FrameCache
+
+
+def test_frame_cache(tmp_path, write_part_files):
+    mainfile = write_part_files(3)
+    cache = FrameCache(os.path.join(tmp_path, 'cache'))
+    data_file_object = rf.read_files(mainfile, max_workers=1, cache=cache)
+    cached_object = rf.read_files(mainfile, max_workers=1, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    pd.testing.assert_frame_equal(cached_object.data, data_file_object.data)
+    assert cached_object.units == data_file_object.units
+    assert cached_object.header == data_file_object.header
+
+
+def test_frame_cache_eviction(tmp_path):
+    test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
+    cache = FrameCache(os.path.join(tmp_path, 'cache'), max_size=0)
+    rf.read_files(test_file, cache=cache)
+    assert os.listdir(cache.directory) == []
+
+
+def test_read_incremental(tmp_path):
+    test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
+    with open(test_file, 'rb') as file:
+        lines = file.readlines()
+    mainfile = os.path.join(tmp_path, 'running.csv')
+    cache = FrameCache(os.path.join(tmp_path, 'cache'))
+    # A running test with a partly written last row
+    with open(mainfile, 'wb') as file:
+        file.writelines(lines[:200])
+        file.write(lines[200][:10])
+    first_read = rf.read_files(mainfile, cache=cache, incremental=True)
+    assert len(first_read.data) == 200 - 18  # noqa: PLR2004
+    assert first_read.end_offset == sum(len(line) for line in lines[:200])
+
+    with open(mainfile, 'ab') as file:
+        file.write(lines[200][10:])
+        file.writelines(lines[201:])
+    data_file_object = rf.read_files(mainfile, cache=cache, incremental=True)
+    full_read = rf.read_single_file(mainfile)
+    pd.testing.assert_frame_equal(
+        data_file_object.data, full_read.data, check_dtype=False
+    )
+    assert cache.hits == 1
+
+    # Changed rows before the last parsed offset lead to a full read
+    with open(mainfile, 'wb') as file:
+        file.writelines(lines[:20] + lines[21:])
+    data_file_object = rf.read_files(mainfile, cache=cache, incremental=True)
+    assert len(data_file_object.data) == len(lines) - 19
+    assert cache.hits == 2  # noqa: PLR2004
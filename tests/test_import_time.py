@@ -0,0 +1,73 @@
+import subprocess
+import sys
+
+import pytest
+
+# Modules loaded by the registered entry points, NOMAD itself is imported
+# beforehand so that only the plugin is measured
+ENTRY_POINT_MODULES = [
+    'nomad_greenlight_plugin.parsers.parser',
+    'nomad_greenlight_plugin.schema_packages.schema_package',
+]
+NOMAD_MODULES = [
+    'nomad.config',
+    'nomad.datamodel',
+    'nomad.metainfo',
+    'nomad.normalizing',
+    'nomad.parsing.parser',
+]
+# Packages only imported when an entry is normalized. h5py is not deferred,
+# NOMAD's HDF5Reference type and file storage import it in every process.
+DEFERRED_PACKAGES = ['plotly']
+SCHEMA_MODULE = 'nomad_greenlight_plugin.schema_packages.schema_package'
+# Import time budget of a plugin module in microseconds
+IMPORT_TIME_BUDGET = 1_000_000
+
+
+def import_times(*modules):
+    statement = '; '.join(f'import {module}' for module in modules)
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:') :].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def loaded_modules(*modules):
+    # Names in sys.modules of a fresh interpreter after importing the modules
+    statement = '; '.join(f'import {module}' for module in ['sys', *modules])
+    process = subprocess.run(
+        [sys.executable, '-c', f'{statement}; print(*sys.modules)'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(process.stdout.split())
+
+
+@pytest.mark.parametrize('module', ENTRY_POINT_MODULES)
+def test_import_time(module):
+    times = import_times(*NOMAD_MODULES, module)
+    assert times[module] < IMPORT_TIME_BUDGET
+
+
+@pytest.mark.parametrize('module', ENTRY_POINT_MODULES)
+def test_deferred_packages(module):
+    modules = loaded_modules(*NOMAD_MODULES, module)
+    for package in DEFERRED_PACKAGES:
+        assert package not in modules
+
+
+def test_normalizer_import():
+    # NOMAD loads the normalizer entry point in every process
+    modules = loaded_modules(*NOMAD_MODULES)
+    assert 'nomad_greenlight_plugin.normalizers.normalizer' in modules
+    assert SCHEMA_MODULE not in modules
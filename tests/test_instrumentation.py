@@ -0,0 +1,45 @@
+import os
+import pstats
+
+import numpy as np
+from nomad.datamodel import EntryArchive
+
+from nomad_greenlight_plugin import instrumentation
+from nomad_greenlight_plugin.parsers import parser as parser_module
+from nomad_greenlight_plugin.parsers.parser import GreenlightParser
+
+
+def test_stage_timer():
+    # Stages outside of a run are not measured
+    with instrumentation.stage('ignored'):
+        pass
+    timer = instrumentation.StageTimer('parser', trace_memory=True)
+    with timer.activate():
+        with instrumentation.stage('outer'):
+            for _ in range(3):
+                with instrumentation.stage('inner'):
+                    values = np.ones(10**6)
+            del values
+    assert list(timer.records) == ['outer/inner', 'outer']
+    assert timer.records['outer/inner']['calls'] == 3  # noqa: PLR2004
+    assert timer.records['outer']['peak_memory'] >= 8 * 10**6
+    assert (
+        timer.records['outer']['wall_time'] >= timer.records['outer/inner']['wall_time']
+    )
+    assert instrumentation.active_timer.get() is None
+
+
+def test_parse_processing_stages(monkeypatch, tmp_path):
+    test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
+    configuration = parser_module.configuration
+    monkeypatch.setattr(configuration, 'store_processing_metrics', True)
+    monkeypatch.setattr(configuration, 'profiler', 'cprofile')
+    monkeypatch.setattr(configuration, 'profile_directory', str(tmp_path))
+    archive = EntryArchive()
+    GreenlightParser().parse(test_file, archive, None)
+    stages = {stage.name: stage for stage in archive.data.processing_stages}
+    assert {'read_files', 'read_files/read_csv', 'store_tags'} <= set(stages)
+    assert stages['read_files'].component == 'parser'
+    assert stages['read_files'].peak_memory is None
+    stats = pstats.Stats(str(tmp_path / 'test_greenlight.parser.prof'))
+    assert stats.total_calls > 0
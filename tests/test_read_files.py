@@ -0,0 +1,245 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nomad_greenlight_plugin import analysis
+from nomad_greenlight_plugin import read_files as rf
+
+test_file = os.path.join('tests', 'data', 'test_greenlight.csv')
+
+
+def test_read_single_file():
+    data_file_object = rf.read_single_file(test_file, engine='c')
+    data = data_file_object.data
+    assert data.shape == (378, 360)
+    assert data_file_object.header['Test Name'] == 'maxcoat-80ti-ast_gts1_ast-mc'
+    assert data_file_object.units['cell_voltage_mean'] == 'volt'
+    assert data_file_object.units['time'] == 'second'
+    assert data_file_object.units['current_density'] == 'ampere / centimeter ** 2'
+    assert not data_file_object.unknown_units
+    assert data['cell_voltage_total'].dtype == float
+    assert (data['file_mark'] != '').all()
+
+
+def test_pyarrow_engine():
+    pytest.importorskip('pyarrow')
+    data_c = rf.read_single_file(test_file, engine='c').data
+    data_pyarrow = rf.read_single_file(test_file, engine='pyarrow').data
+    pd.testing.assert_frame_equal(data_c, data_pyarrow)
+
+
+def test_read_multiple_files(write_part_files):
+    mainfile = write_part_files(12)
+    expected = rf.read_single_file(test_file).data
+    sequential = rf.read_files(mainfile, max_workers=1).data
+    parallel = rf.read_files(mainfile, max_workers=4).data
+    pd.testing.assert_frame_equal(sequential, parallel)
+    pd.testing.assert_frame_equal(sequential[expected.columns], expected)
+
+
+def test_list_part_files(write_part_files):
+    mainfile = write_part_files(3)
+    # Files of other types with the name of a part are not parts
+    with open(mainfile.replace('.csv', '.h5'), 'wb'):
+        pass
+    root_name, _ = rf.split_part_name(mainfile)
+    part_files = rf.list_part_files(mainfile, root_name)
+    assert [os.path.basename(file) for file in part_files] == [
+        f'test - part_{part}.csv' for part in range(3)
+    ]
+
+
+def test_read_chunked(monkeypatch, write_part_files):
+    monkeypatch.setattr(rf, 'MIN_CHUNK_ROWS', 50)
+    expected = rf.read_single_file(test_file)
+    # The columns do not fit into the memory limit and are backed by a file
+    data_file_object = rf.read_files(test_file, memory_limit=1)
+    pd.testing.assert_frame_equal(data_file_object.data, expected.data)
+    assert data_file_object.conversion_issues == expected.conversion_issues
+    segments, statistics = analysis.segment_statistics(expected.data)
+    pd.testing.assert_frame_equal(data_file_object.segments[0], segments)
+    pd.testing.assert_frame_equal(data_file_object.segments[1], statistics)
+
+    mainfile = write_part_files(5)
+    expected = rf.read_files(mainfile, max_workers=1).data
+    data = rf.read_files(mainfile, memory_limit=1).data
+    pd.testing.assert_frame_equal(data, expected)
+
+
+def test_select_columns():
+    columns = ['time_stamp', 'variable_01', 'valve_h2_supply', 'current']
+    assert rf.select_columns(columns) == columns
+    assert rf.select_columns(columns, dict(exclude=['scratch', 'valve_*'])) == [
+        'time_stamp',
+        'current',
+    ]
+    assert rf.select_columns(
+        columns, dict(include=['valves', 'current'], exclude=['current'])
+    ) == ['time_stamp', 'valve_h2_supply']
+
+
+@pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+def test_read_tag_selection(engine):
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    tag_selection = dict(include=['cell_voltage_*', 'current'])
+    data_file_object = rf.read_single_file(
+        test_file, engine=engine, tag_selection=tag_selection
+    )
+    data = data_file_object.data
+    assert list(data.columns[:3]) == list(rf.REQUIRED_COLUMNS)
+    assert 'current_density' not in data.columns
+    assert list(data_file_object.units) == list(data.columns)
+    expected = rf.read_single_file(test_file, engine=engine).data
+    pd.testing.assert_frame_equal(data, expected[data.columns])
+
+
+@pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+def test_conversion_issues(monkeypatch, tmp_path, engine):
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    read_data = rf.read_data
+    reads = []
+
+    def count_reads(*args, **kwargs):
+        reads.append(args)
+        return read_data(*args, **kwargs)
+
+    monkeypatch.setattr(rf, 'read_data', count_reads)
+    with open(test_file, 'rb') as file:
+        lines = file.readlines()
+    row = lines[20].split(b',')
+    column = lines[17].split(b',').index(b'cell_voltage_mean')
+    row[column] = b'ERR'
+    lines[20] = b','.join(row)
+    file_path = os.path.join(tmp_path, 'test.csv')
+    with open(file_path, 'wb') as file:
+        file.writelines(lines)
+
+    column_types = {'cell_voltage_mean': 'float64', 'current': 'float64'}
+    data_file_object = rf.read_single_file(
+        file_path, engine=engine, column_types=column_types
+    )
+    data = data_file_object.data
+    assert data['cell_voltage_mean'].dtype == float
+    assert data['cell_voltage_mean'].isna().sum() == 1
+    assert data_file_object.conversion_issues == {
+        'cell_voltage_mean': dict(count=1, examples=['ERR'])
+    }
+    # The unparsable value does not cause a second pass over the file
+    assert len(reads) == 1
+
+
+@pytest.mark.parametrize('engine', ['c', 'pyarrow', 'chunked'])
+def test_read_windows_encoding(monkeypatch, tmp_path, engine):
+    # Data rows of exports written with the Windows code page are decoded in
+    # the encoding detected from their preamble
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    with open(test_file, encoding='utf-8') as file:
+        lines = file.read().replace('cm\ufffd', 'cm²').replace('\ufffd', '°')
+    lines = lines.splitlines(keepends=True)
+    lines[18] = lines[18].replace('characterization', '80°C_hold')
+    file_path = os.path.join(tmp_path, 'test.csv')
+    with open(file_path, 'wb') as file:
+        file.write(''.join(lines).encode('cp1252'))
+
+    if engine == 'chunked':
+        monkeypatch.setattr(rf, 'MIN_CHUNK_ROWS', 50)
+        data_file_object = rf.read_files(file_path, memory_limit=1)
+    else:
+        data_file_object = rf.read_single_file(file_path, engine=engine)
+    assert data_file_object.data['file_mark'].iloc[:12].tolist() == ['80°C_hold'] * 12
+    assert data_file_object.units['cell_active_area'] == 'centimeter ** 2'
+    assert data_file_object.unknown_units == {}
+
+
+def test_time_stamps_to_milliseconds():
+    time_stamps = pd.Series(
+        [
+            '2023-07-15 07:47:39.005',
+            '1969-12-31 23:59:59.999',
+            '2024-02-29 12:00:00.000',
+            '2023-07-15 07:47:39',
+            '2023-13-15 07:47:39.005',
+            'characterization',
+            '',
+        ]
+    )
+    milliseconds, invalid = rf.time_stamps_to_milliseconds(time_stamps)
+    expected = (
+        pd.to_datetime(time_stamps[:4], format='mixed')
+        .to_numpy()
+        .astype('datetime64[ms]')
+    )
+    assert (milliseconds[:4] == expected.astype('int64')).all()
+    assert invalid.tolist() == [False] * 4 + [True] * 3
+
+
+def test_time():
+    data_file_object = rf.read_single_file(test_file)
+    time = data_file_object.data['time']
+    assert str(data_file_object.start_time) == '2023-07-15 07:47:38'
+    assert time.iloc[0] == 1.005  # noqa: PLR2004
+    assert 'time_stamp' not in data_file_object.conversion_issues
+
+
+def test_encode_run_lengths():
+    data = pd.DataFrame(
+        dict(
+            setpoint=[1.0, 1.0, 2.0, 2.0, 2.0, 1.0],
+            limit=[np.nan, np.nan, 5.0, 5.0, 5.0, 5.0],
+            signal=[0.1, 0.2, 0.3, 0.4, 0.5, 0.6],
+        )
+    )
+    encoded = rf.encode_run_lengths(data, list(data.columns), 0.5)
+    assert list(encoded) == ['setpoint', 'limit']
+    change_indices, values = encoded['setpoint']
+    assert change_indices.tolist() == [0, 2, 5]
+    assert values.tolist() == [1.0, 2.0, 1.0]
+    change_indices, values = encoded['limit']
+    assert change_indices.tolist() == [0, 2]
+    np.testing.assert_array_equal(values, [np.nan, 5.0])
+
+
+def test_read_overlapping_parts(monkeypatch, tmp_path):
+    # The second part repeats the last three rows of the first part, the third
+    # part starts after a gap
+    with open(test_file, 'rb') as file:
+        lines = file.readlines()
+    preamble, rows = lines[:18], lines[18:]
+    part_rows = [rows[:100], rows[97:210], rows[250:]]
+    for part, part_lines in enumerate(part_rows):
+        with open(os.path.join(tmp_path, f'test - part_{part}.csv'), 'wb') as file:
+            file.writelines(preamble + part_lines)
+    mainfile = os.path.join(tmp_path, 'test - part_0.csv')
+    expected = rf.read_single_file(test_file).data
+    expected = expected.drop(index=range(210, 250)).reset_index(drop=True)
+
+    data_file_object = rf.read_files(mainfile, max_workers=1)
+    data = data_file_object.data
+    pd.testing.assert_frame_equal(data[expected.columns], expected)
+    assert [
+        (issue['part'], issue['kind']) for issue in data_file_object.part_issues
+    ] == [(1, 'overlap'), (2, 'gap')]
+    assert data_file_object.part_issues[0]['duplicates'] == 3  # noqa: PLR2004
+
+    monkeypatch.setattr(rf, 'MIN_CHUNK_ROWS', 50)
+    chunked = rf.read_files(mainfile, memory_limit=1)
+    pd.testing.assert_frame_equal(chunked.data, data)
+    assert chunked.part_issues == data_file_object.part_issues
+
+
+def test_merge_positions():
+    positions, part_issues = rf.merge_positions(
+        [np.array([0.0, 1.0, 2.0]), np.array([1.5, 2.0, 3.0])]
+    )
+    assert positions.tolist() == [0, 1, 3, 2, -1, 4]
+    assert part_issues == [
+        dict(part=1, kind='overlap', start=1.5, end=2.0, duplicates=1)
+    ]
+    positions, part_issues = rf.merge_positions([np.arange(3.0), np.arange(3.0, 6)])
+    assert positions is None
+    assert part_issues == []
@@ -0,0 +1,30 @@
+import numpy as np
+
+from nomad_greenlight_plugin import read_files as rf
+from nomad_greenlight_plugin import synthetic
+
+
+def test_write_series(tmp_path):
+    file_paths = synthetic.write_series(tmp_path, 2500, parts=2, segment_rows=500)
+    assert [rf.split_part_name(file_path)[1] for file_path in file_paths] == [0, 1]
+    data_file_object = rf.read_files(file_paths[0], max_workers=1)
+    data = data_file_object.data
+    template = rf.read_single_file(synthetic.TEMPLATE_FILE).data
+    assert sorted(data.columns) == sorted(template.columns)
+    assert data_file_object.header['Test Name'] == synthetic.TEST_NAME
+    assert data_file_object.conversion_issues == {}
+    np.testing.assert_allclose(data['time'], np.arange(2500))
+    # The file mark is only written on the first row of a segment and filled
+    # in by the reader
+    assert (
+        data['file_mark'].tolist() == np.repeat(synthetic.SEGMENT_LABELS, 500).tolist()
+    )
+    with open(file_paths[0], encoding='utf-8') as file_handle:
+        lines = file_handle.read().splitlines()[-len(data) // 2 :]
+    marked = [i for i, line in enumerate(lines) if line.split(',')[2]]
+    assert marked == [0, 500, 1000]
+    np.testing.assert_allclose(
+        data['current_density'] * template['cell_active_area'][0],
+        data['current'],
+        atol=1e-4,
+    )
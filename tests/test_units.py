@@ -0,0 +1,36 @@
+import pytest
+
+from nomad_greenlight_plugin import read_files as rf
+from nomad_greenlight_plugin import units
+
+
+@pytest.mark.parametrize(
+    'unit, pint_unit',
+    [
+        ('V', 'volt'),
+        ('N/A', 'dimensionless'),
+        ('OFF/ON', 'dimensionless'),
+        ('%', 'percent'),
+        ('NLPM', 'liter / minute'),
+        ('kPag', 'kilopascal'),
+        ('Ohms', 'ohm'),
+        ('°C', 'degree_Celsius'),
+        ('\ufffdC', 'degree_Celsius'),
+        ('A/cm\ufffd', 'ampere / centimeter ** 2'),
+        ('cm²', 'centimeter ** 2'),
+        ('unknown unit', None),
+    ],
+)
+def test_resolve_unit(unit, pint_unit):
+    assert units.resolve_unit(unit) == pint_unit
+
+
+def test_resolve_units():
+    resolved, unknown = units.resolve_units(dict(a='V', b='bananas'))
+    assert resolved == dict(a='volt')
+    assert unknown == dict(b='bananas')
+
+
+def test_split_row_windows_encoding():
+    assert rf.split_row('°C,A/cm²\r\n'.encode('cp1252')) == ['°C', 'A/cm²']
+    assert rf.split_row('°C,A/cm²\r\n'.encode()) == ['°C', 'A/cm²']